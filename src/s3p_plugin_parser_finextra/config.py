@@ -1,4 +1,6 @@
 import datetime
+import os
+import tempfile
 
 from s3p_sdk.plugin.config import (
     PluginConfig,
@@ -56,7 +58,33 @@ config = PluginConfig(
                     'https://www.finextra.com/rss/channel.aspx?channel=security/feed',
                     'https://www.finextra.com/rss/channel.aspx?channel=startups/feed',
                     'https://www.finextra.com/rss/channel.aspx?channel=transaction/feed',
-                ])
+                ]),
+                payload.entry.ConstParamConfig('workers', 4),       # Количество потоков загрузки страниц
+                payload.entry.ConstParamConfig('rate', 2.0),        # Начальная частота запросов в секунду (адаптивная)
+                payload.entry.ConstParamConfig('timeout', 30.0),    # Таймаут HTTP запроса (сек.)
+                payload.entry.ConstParamConfig('retries', 3),       # Количество повторов HTTP запроса
+                # Каталог состояния между запусками (валидаторы фидов и т.п.). Пустая строка отключает состояние
+                payload.entry.ConstParamConfig('state_dir', os.path.join(tempfile.gettempdir(), 's3p_plugin_parser_finextra')),
+                # Способ разбора страниц: html.parser, html.parser-strained, lxml, lxml-strained (lxml - опционально)
+                payload.entry.ConstParamConfig('html_backend', 'html.parser-strained'),
+                # Количество процессов разбора страниц (0 - разбор в потоках загрузки). Полезно для больших выгрузок
+                payload.entry.ConstParamConfig('parse_workers', 0),
+                # rss - новые материалы из фидов;
+                # reextract - повторный разбор страниц из архива страниц (archive_pages) без обращения к сети
+                payload.entry.ConstParamConfig('mode', 'rss'),
+                # Размер дискового кэша ответов в state_dir (МиБ). 0 отключает кэш
+                payload.entry.ConstParamConfig('cache_size', 256),
+                # Сохранять загруженные страницы в state_dir для mode=reextract. Архив не ограничен по размеру,
+                # поэтому включается только на время, пока нужен повторный разбор
+                payload.entry.ConstParamConfig('archive_pages', False),
+                # Наибольший размер страницы (байт). 0 снимает ограничение
+                payload.entry.ConstParamConfig('max_body_size', 8 * 1024 * 1024),
+                # Номер экземпляра и количество экземпляров плагина, разделяющих фиды (согласованное хэширование).
+                # При shard_count > 1 состояние экземпляра хранится в state_dir/shard-{shard_index}
+                payload.entry.ConstParamConfig('shard_index', 0),
+                payload.entry.ConstParamConfig('shard_count', 1),
+                # Общий для экземпляров каталог дедупликации ссылок. Пустая строка отключает общую дедупликацию
+                payload.entry.ConstParamConfig('shared_dir', ''),
             ]
         )
     )
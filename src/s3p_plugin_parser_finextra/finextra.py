@@ -1,18 +1,40 @@
-import copy
+import bisect
+import codecs
+import functools
+import hashlib
+import heapq
+import importlib.util
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
 import time
-from datetime import datetime
-from typing import Iterator
+import types
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor
+from contextlib import closing, contextmanager, ExitStack
+import dataclasses
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from typing import Iterator, Iterable, Callable, TypeVar, TYPE_CHECKING
+from urllib.parse import urlparse, parse_qs, urljoin
 
-import dateparser
-import dateutil.parser
-import feedparser
 from s3p_sdk.exceptions.parser import S3PPluginParserOutOfRestrictionException, S3PPluginParserFinish
 from s3p_sdk.plugin.payloads.parsers import S3PParserBase
 from s3p_sdk.types import S3PRefer, S3PDocument, S3PPlugin, S3PPluginRestrictions
 from s3p_sdk.types.plugin_restrictions import FROM_DATE
-import requests
-from bs4 import BeautifulSoup
-from random import randint
+
+# Платформа загружает модуль для каждой задачи, а процессы разбора (parse_workers) - в каждом процессе.
+# Тяжёлые зависимости (requests, feedparser, bs4, dateutil) импортируются там, где используются впервые
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+T = TypeVar('T')
+R = TypeVar('R')
 
 
 class Finextra(S3PParserBase):
@@ -20,61 +42,450 @@ class Finextra(S3PParserBase):
     A Parser payload that uses S3P Parser base class.
     """
 
-    def __init__(self, refer: S3PRefer, plugin: S3PPlugin, restrictions: S3PPluginRestrictions, feeds: list[str, ...]):
+    def __init__(self, refer: S3PRefer, plugin: S3PPlugin, restrictions: S3PPluginRestrictions, feeds: list[str, ...],
+                 workers: int = 1, rate: float = 1.0, timeout: float = 30.0, retries: int = 3, state_dir: str = '',
+                 html_backend: str = 'html.parser', parse_workers: int = 0, mode: str = 'rss', cache_size: int = 0,
+                 archive_pages: bool = False, max_body_size: int = 0, shard_index: int = 0, shard_count: int = 1,
+                 shared_dir: str = ''):
+        """
+        :param feeds: список RSS фидов.
+        :param workers: количество потоков, загружающих страницы. При значении 1 страницы загружаются последовательно.
+        :param rate: начальное число запросов в секунду к хосту. Подстраивается по ответам (см. Finextra.RateLimiter).
+            0 отключает ограничение.
+        :param timeout: таймаут HTTP запроса в секундах.
+        :param retries: количество повторов HTTP запроса при сетевых ошибках и ответах 429/5xx.
+        :param state_dir: каталог для состояния между запусками. Пустая строка отключает сохранение состояния.
+            При shard_count > 1 каждый экземпляр хранит состояние в собственном подкаталоге shard-{shard_index}.
+        :param html_backend: способ разбора страниц (см. Finextra.BACKENDS). Варианты "-strained" строят
+            только разделы страницы, которые читают профили.
+        :param parse_workers: количество процессов, разбирающих страницы. При значении 0 страница разбирается
+            в потоке, который её загрузил.
+        :param mode: "rss" - документы из фидов; "reextract" - повторный разбор страниц из архива страниц
+            (см. Finextra.PageArchive) текущими профилями без обращения к сети. Экспериментальный "backfill" -
+            историческая загрузка из архива каналов фидов (см. Finextra._archive) до from_date.
+        :param cache_size: размер дискового кэша ответов в state_dir в МиБ (см. Finextra.ResponseCache).
+            0 отключает кэш.
+        :param archive_pages: сохранять загруженные страницы в архив в state_dir для mode="reextract".
+        :param max_body_size: наибольший размер страницы в байтах. Страница больше этого размера не разбирается.
+            0 снимает ограничение.
+        :param shard_index: номер экземпляра плагина среди shard_count экземпляров, разделяющих фиды.
+        :param shard_count: количество экземпляров плагина. Экземпляр обрабатывает фиды, которые ему назначает
+            кольцо согласованного хэширования (см. Finextra.ShardRing).
+        :param shared_dir: общий для экземпляров каталог, через который они закрепляют за собой ссылки
+            (см. Finextra.LinkClaims). Пустая строка отключает общую дедупликацию.
+        """
         super().__init__(refer, plugin, restrictions)
 
         # Тут должны быть инициализированы свойства, характерные для этого парсера. Например: WebDriver
-        self.feeds = feeds
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f'shard_index {shard_index} is out of range for shard_count {shard_count}')
+        self.shard_index = shard_index
+        ring = Finextra.ShardRing(shard_count)
+        self.feeds = [feed for feed in feeds if ring.shard(feed) == shard_index]
+        if shard_count > 1:
+            self.logger.info(f'Shard {shard_index}/{shard_count}: {len(self.feeds)} of {len(feeds)} feeds')
+        self._claims = Finextra.LinkClaims(shared_dir)
+        if state_dir and shard_count > 1:
+            # Состояние экземпляров не общее: checkpoint, валидаторы фидов и архив страниц у каждого свои
+            state_dir = os.path.join(state_dir, f'shard-{shard_index}')
+        self.workers = max(1, workers)
+        self.limiter = Finextra.RateLimiter(rate)
+        self.metrics = Finextra.Metrics()
+        # Вызывается с итоговыми метриками (Finextra.Metrics.summary) в конце каждого запуска
+        self.metrics_hook: Callable[[dict], None] | None = None
+        self.cache = Finextra.ResponseCache(state_dir, cache_size * 1024 * 1024)
+        self._transport = Finextra.Transport(timeout, retries, pool_size=self.workers, limiter=self.limiter,
+                                             metrics=self.metrics, cache=self.cache)
+        self.state_dir = state_dir
+        self._validators = Finextra.ValidatorStore(state_dir)
+        self._links = Finextra.LinkIndex()
+        self._seen = Finextra.SeenIndex(state_dir)
+        self._fingerprints = Finextra.Fingerprints(state_dir)
+        self.retries = Finextra.RetryQueue()
+        if html_backend not in Finextra.BACKENDS:
+            raise ValueError(f'Unknown html_backend {html_backend}. Available: {", ".join(Finextra.BACKENDS)}')
+        if Finextra.BACKENDS[html_backend][0] == 'lxml' and importlib.util.find_spec('lxml') is None:
+            self.logger.warning(f'lxml is not installed. html_backend {html_backend} falls back to html.parser')
+            html_backend = html_backend.replace('lxml', 'html.parser')
+        self.html_backend = html_backend
+        if mode not in Finextra.MODES + Finextra.EXPERIMENTAL_MODES:
+            raise ValueError(f'Unknown mode {mode}. Available: {", ".join(Finextra.MODES)}')
+        if mode in Finextra.EXPERIMENTAL_MODES:
+            self.logger.warning(f'mode {mode} is experimental: listing markup is not verified against finextra.com')
+        self.mode = mode
+        self._checkpoint = Finextra.Checkpoint(state_dir, self._scope())
+        if mode == 'reextract' and parse_workers <= 0:
+            # Повторный разбор архива ограничен только CPU
+            parse_workers = os.cpu_count() or 1
+        if parse_workers > 0 and not Finextra._registered():
+            self.logger.warning(f'Module name {Finextra.__module__} is taken by another module. Pages are parsed in threads')
+            parse_workers = 0
+        self.parse_workers = parse_workers
+        self._extractors: Executor | None = None
+        self._pages = Finextra.PageArchive(state_dir, archive_pages or mode == 'reextract')
+        self.max_body_size = max_body_size
+
+    def _scope(self) -> dict:
+        """Параметры запуска, при которых checkpoint может быть продолжен (см. Finextra.Checkpoint)"""
+        restriction = self._restriction
+        return {
+            'feeds': list(self.feeds),
+            'mode': self.mode,
+            'restrictions': {
+                'maximum_materials': restriction.maximum_materials,
+                'to_last_material': restriction.to_last_material.link if restriction.to_last_material else None,
+                'from_date': restriction.from_date.isoformat() if restriction.from_date else None,
+                'to_date': restriction.to_date.isoformat() if restriction.to_date else None,
+            },
+        }
 
     def _parse(self):
         """
-        Парсер сначала получает document из фидов. После запроса страницы передаёт в document.other
-        словарь "general", куда добавляется текст, возвращаемый find_text, а затем словарь
+        Парсер сначала получает document из фидов. Фиды объединяются в один поток от новых документов к старым,
+        поэтому maximum_materials и from_date применяются ко всем фидам сразу. После запроса страницы передаёт
+        в document.other словарь "general", куда добавляется текст, возвращаемый find_text, а затем словарь
         "additionals_dict", возвращаемый find_additions.
         """
-        if isinstance(self._restriction.maximum_materials, int) and self._restriction.maximum_materials // len(
-                self.feeds) >= 2:
-            number = self._restriction.maximum_materials // len(self.feeds) + 1
+        started = time.monotonic()
+        try:
+            self._resume()
+            with ExitStack() as stack:
+                if self.parse_workers > 0:
+                    # spawn: дочерние процессы не наследуют потоки загрузки и открытые соединения
+                    self._extractors = stack.enter_context(ProcessPoolExecutor(
+                        max_workers=self.parse_workers, mp_context=multiprocessing.get_context('spawn'),
+                        initializer=exec,
+                        initargs=(Finextra.EXTRACTOR_INIT, {'name': Finextra.__module__, 'path': __file__}),
+                    ))
+                    stack.callback(setattr, self, '_extractors', None)
+                pool = stack.enter_context(ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='finextra'))
+                if self.mode == 'reextract':
+                    documents = self._reextracted(pool)
+                else:
+                    documents = self._fetched(
+                        pool, self._claimed(self._unseen(self._admissible(self._unique(self._merged(pool))))),
+                    )
+                with closing(documents) as documents:
+                    for parsed_document in documents:
+                        try:
+                            parsed_document.other['channels'] = self._links.channels(parsed_document.link)
+                            parsed_document.loaded = datetime.now()
+                            with self.metrics.time('find'):
+                                self._find(parsed_document)
+                            self._checkpoint.done(parsed_document.link)
+                        except S3PPluginParserOutOfRestrictionException as e:
+                            self.logger.warning(f"Document {parsed_document.link} is outside the specified date range")
+                            self.metrics.count(f'rejected.{e.restriction.lower()}')
+                            self._checkpoint.done(parsed_document.link)
+                            if e.restriction == FROM_DATE:
+                                break
+                        except S3PPluginParserFinish as e:
+                            raise e
+                        finally:
+                            self._checkpoint.tick(self._parsed_document)
+            # Фиды обработаны: при следующем запуске они будут запрошены условным GET. Валидаторы фида, страницы
+            # которого так и не удалось обработать, не сохраняются: иначе фид ответит 304 и страницы не будут повторены
+            incomplete = self._links.feeds(self.retries.failures())
+            for feed in self.feeds:
+                if feed in incomplete:
+                    self.logger.warning(f'RSS feed {feed} has failed pages. It will be fully requested in the next run')
+                    continue
+                self._validators.commit(feed)
+        except S3PPluginParserFinish:
+            self._completed()
+            raise
+        except Exception:
+            if self._checkpoint.resumed:
+                # Продолженный запуск снова прерван: ошибка, вероятно, повторяется, следующий запуск начнётся заново
+                self.logger.warning('Resumed run failed again. Checkpoint is removed')
+                self._checkpoint.clear()
+            else:
+                self._checkpoint.save(self._parsed_document)
+            raise
         else:
-            number = None
-
-        for feed in self.feeds:
-            for document in self._slices(
-                self._rss_feed(feed),
-                number
-            ):
-                time.sleep(randint(1,3))
-                parsed_document = self._parsed_webpage(document)
-                try:
-                    parsed_document.loaded = datetime.now()
-                    self._find(parsed_document)
-                except S3PPluginParserOutOfRestrictionException as e:
-                    self.logger.warning(f"Document {parsed_document.link} is outside the specified date range")
-                    if e.restriction == FROM_DATE:
-                        break
-                except S3PPluginParserFinish as e:
-                    raise e
+            self._completed()
+        finally:
+            self.metrics.observe('run', time.monotonic() - started)
+            self._report()
+
+    def _resume(self):
+        """
+        Продолжает прерванный запуск: восстанавливает валидаторы фидов и передаёт в _find документы,
+        найденные до прерывания, без повторной загрузки страниц.
+        """
+        if self._checkpoint.discarded is not None:
+            self.logger.warning(f'Checkpoint is discarded: {self._checkpoint.discarded}')
+        if not self._checkpoint.resumed:
+            return
+        self.logger.info(f'Resume from checkpoint (attempt {self._checkpoint.resumes}): {len(self._checkpoint.documents)} documents, '
+                         f'{len(self._checkpoint.processed)} processed links')
+        for feed, validator in self._checkpoint.validators().items():
+            self._validators.restore(feed, validator)
+        for document in self._checkpoint.documents:
+            self._links.adopt(document.link, document.other.setdefault('channels', []))
+            try:
+                self._find(document)
+            except S3PPluginParserOutOfRestrictionException:
+                self.logger.warning(f"Document {document.link} is outside the specified date range")
+
+    def _merged(self, pool: Executor) -> Iterator[tuple[str, S3PDocument]]:
+        """
+        Загружает фиды параллельно и объединяет их записи в один поток (feed, document),
+        упорядоченный по дате публикации от новых к старым.
+        В mode="backfill" архивы каналов читаются по мере объединения (см. Finextra._archive), поэтому
+        ограничения запуска (maximum_materials, from_date) прекращают и загрузку архивов.
+        """
+        def failed(feed: str, error: Exception):
+            # Недоступный фид не останавливает обработку остальных
+            self.logger.error(f'RSS feed {feed} is skipped: {error!r}')
+            self.retries.fail(feed, error)
+            self.metrics.count('feed.failed')
+
+        def entries(feed: str) -> list[tuple[str, S3PDocument]]:
+            try:
+                documents = self._checkpoint.entries(feed)
+                if documents is not None:
+                    self.metrics.count('feed.checkpoint')
+                else:
+                    documents = list(self._rss_feed(feed))
+                    self._checkpoint.feed(feed, documents, self._validators.staged(feed))
+                return sorted(((feed, document) for document in documents),
+                              key=lambda item: item[1].published, reverse=True)
+            except (OSError, ValueError) as e:
+                failed(feed, e)
+                return []
+
+        def archived(feed: str) -> Iterator[tuple[str, S3PDocument]]:
+            # Записи архива не сохраняются в checkpoint: продолженный запуск читает архив заново,
+            # а уже обработанные ссылки пропускает (Checkpoint.processed)
+            try:
+                for document in self._archive(feed):
+                    yield feed, document
+            except (OSError, ValueError) as e:
+                failed(feed, e)
+
+        if self.mode == 'backfill':
+            streams = [archived(feed) for feed in self.feeds]
+        else:
+            streams = pool.map(entries, self.feeds)
+        yield from heapq.merge(*streams, key=lambda item: item[1].published, reverse=True)
+
+    def _completed(self):
+        """Сохраняет состояние успешно завершённого запуска"""
+        if failures := self.retries.failures():
+            self.logger.warning(f'{len(failures)} materials were not parsed: {failures}')
+        self._checkpoint.clear()
+        self._seen.commit(document.link for document in self._parsed_document)
+        self._fingerprints.commit()
+
+    def _report(self):
+        """Итоговые метрики запуска: пишутся в лог одной JSON строкой и передаются в metrics_hook"""
+        summary = self.metrics.summary()
+        summary['documents'] = len(self._parsed_document)
+        summary['failures'] = len(self.retries.failures())
+        summary['hosts'] = self.limiter.stats()
+        summary['cache'] = self.cache.stats()
+        self.logger.info(f'Metrics: {json.dumps(summary, sort_keys=True)}')
+        if self.metrics_hook is not None:
+            try:
+                self.metrics_hook(summary)
+            except Exception as e:
+                self.logger.warning(f'Metrics hook failed: {e!r}')
+
+    def _admissible(self, documents: Iterator[S3PDocument]) -> Iterator[S3PDocument]:
+        """
+        Проверяет ограничения по метаданным фида до запроса страницы.
+        Документ старше from_date завершает поток (он упорядочен от новых к старым),
+        документ новее to_date пропускается.
+        """
+        restriction = self._restriction
+        for document in documents:
+            if restriction.maximum_materials is not None and len(self._parsed_document) >= restriction.maximum_materials:
+                raise S3PPluginParserFinish(self._plugin, f"Max count articles reached ({restriction.maximum_materials})")
+            if restriction.from_date is not None and document.published < restriction.from_date:
+                self.logger.warning(f"Document {document.link} is outside the specified date range")
+                self.metrics.count('rejected.from_date')
+                return
+            if restriction.to_date is not None and document.published > restriction.to_date:
+                self.logger.warning(f"Document {document.link} is outside the specified date range")
+                self.metrics.count('rejected.to_date')
+                continue
+            yield document
+
+    def _unique(self, entries: Iterator[tuple[str, S3PDocument]]) -> Iterator[S3PDocument]:
+        """
+        Пропускает ссылки, уже встреченные в других фидах за этот запуск.
+        Канал повторной ссылки добавляется в other['channels'] уже найденного документа.
+        """
+        for feed, document in entries:
+            channel = self._channel(feed)
+            if self._links.claim(document.link, channel, feed):
+                yield document
+            else:
+                self.logger.debug(f"Document {document.link} is already processed in this run. Channel {channel} added")
+                self.metrics.count('dedup.run')
+
+    def _unseen(self, documents: Iterator[S3PDocument]) -> Iterator[S3PDocument]:
+        """
+        Пропускает ссылки, найденные в предыдущих запусках. Ссылка, которую фид опубликовал заново с более поздней
+        датой, проверяется повторно (см. Finextra.Fingerprints).
+        """
+        for document in documents:
+            if document.link in self._seen and not self._fingerprints.republished(document):
+                self.logger.debug(f"Document {document.link} is already processed in previous runs")
+                self.metrics.count('dedup.seen')
+                continue
+            if document.link in self._checkpoint.processed:
+                self.logger.debug(f"Document {document.link} is already processed before the checkpoint")
+                self.metrics.count('dedup.checkpoint')
+                continue
+            yield document
+
+    def _claimed(self, documents: Iterator[S3PDocument]) -> Iterator[S3PDocument]:
+        """Пропускает ссылки, которые закрепили за собой другие экземпляры плагина (см. Finextra.LinkClaims)"""
+        for document in documents:
+            if not self._claims.claim(document.link, self.shard_index):
+                self.logger.debug(f"Document {document.link} is claimed by another shard")
+                self.metrics.count('dedup.shard')
+                continue
+            yield document
+
+    @staticmethod
+    def _channel(feed: str) -> str:
+        """Название канала из ссылки фида вида .../channel.aspx?channel=ai/feed"""
+        channel = parse_qs(urlparse(feed).query).get('channel')
+        return channel[0].split('/')[0] if channel else feed
+
+    def _fetched(self, pool: Executor, documents: Iterator[S3PDocument]) -> Iterator[S3PDocument]:
+        """
+        Загружает страницы документов в workers потоков. Документы возвращаются строго в порядке потока.
+        Документы, страницы которых не удалось загрузить или разобрать (любая ошибка, кроме ошибок самого запуска),
+        откладываются в очередь повторов и повторяются после основного потока (не более RetryQueue.ATTEMPTS попыток).
+        """
+        yield from self._pipeline(pool, documents)
+        while pending := self.retries.pending():
+            self.logger.info(f'Retry {len(pending)} deferred documents')
+            yield from self._pipeline(pool, pending)
 
-    def _slices(self, feed: Iterator[S3PDocument], number: int | None = None) -> Iterator[S3PDocument]:
-        for current, element in enumerate(feed):
-            if number is not None and current >= number:
-                break
-            yield element
+    def _pipeline(self, pool: Executor, documents: Iterable[S3PDocument]) -> Iterator[S3PDocument]:
+        """
+        Загрузка -> разбор. Без parse_workers страница разбирается в потоке загрузки, иначе загруженные страницы
+        передаются в пул процессов. Между стадиями в работе не более 2 * workers страниц.
+        """
+        window = self.workers * 2
+
+        def defer(document: S3PDocument, error: Exception):
+            self.logger.warning(f'Document {document.link} is deferred: {error!r}')
+            self.metrics.count('documents.deferred')
+            self.retries.defer(document, error)
+
+        def fetch(document: S3PDocument) -> tuple[S3PDocument, S3PDocument | str | None]:
+            try:
+                result = self._parsed_webpage(document) if self._extractors is None else self._webpage(document)
+                if result is None:
+                    # Страница не изменилась (см. Fingerprints.unchanged): отложенный ранее документ не повторяется
+                    self.retries.resolve(document.link)
+                return document, result
+            except Finextra.BodyTooLarge as e:
+                # Повтор снова загрузил бы страницу того же размера
+                self.logger.warning(f'Document {document.link} is skipped: {e}')
+                self.metrics.count('page.too_large')
+                self.retries.drop(document.link, e)
+                return document, None
+            except Exception as e:
+                # Ошибка одной страницы (сеть, разметка, которую не ожидает профиль) не прерывает запуск
+                defer(document, e)
+                return document, None
+
+        fetched = ((document, result) for document, result in self._ordered(pool, fetch, documents, window)
+                   if result is not None)
+        def extracted(pages: Iterable[tuple[S3PDocument, str, str]]) -> Iterator[tuple[S3PDocument, S3PDocument]]:
+            for document, result, elapsed in self._ordered(self._extractors, Finextra._extracted, pages, window):
+                self.metrics.observe('page.parse', elapsed)
+                yield document, result
+
+        if self._extractors is not None:
+            fetched = extracted((document, html, self.html_backend) for document, html in fetched)
+
+        for document, result in fetched:
+            if isinstance(result, Exception):
+                defer(document, result)
+                continue
+            self.retries.resolve(document.link)
+            if not self._fingerprints.changed(result):
+                self.logger.info(f'Document {document.link} is republished without changes')
+                self.metrics.count('page.unchanged')
+                continue
+            yield result
+
+    def _reextracted(self, pool: Executor) -> Iterator[S3PDocument]:
+        """
+        mode="reextract": документы архива страниц (от новых к старым) разбираются текущими профилями
+        в пуле процессов, без обращения к сети. Страницы, которые профили не разобрали, попадают в отчёт об ошибках.
+        """
+        if not self._pages.enabled:
+            self.logger.warning('Page archive is disabled (empty state_dir). Nothing to reextract')
+            return
+        window = self.workers * 2
+
+        def archived() -> Iterator[S3PDocument]:
+            for document in self._admissible(self._pages.documents()):
+                if document.link in self._checkpoint.processed:
+                    continue
+                self._links.adopt(document.link, document.other.setdefault('channels', []))
+                yield document
+
+        pages = ((document, self._pages.page(document.link), self.html_backend) for document in archived())
+        for document, result, elapsed in self._ordered(self._extractors or pool, Finextra._extracted, pages, window):
+            self.metrics.observe('page.parse', elapsed)
+            if isinstance(result, Exception):
+                self.logger.warning(f'Document {document.link} is not reextracted: {result!r}')
+                self.retries.fail(document.link, result)
+                continue
+            yield result
+
+    @staticmethod
+    def _ordered(pool: Executor, fn: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+        """
+        Выполняет fn над items в пуле, держа в работе не более window задач,
+        и отдаёт результаты в исходном порядке. Невыполненные задачи отменяются при закрытии генератора.
+        """
+        pending: deque = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
 
     def _rss_feed(self, url: str) -> Iterator[S3PDocument]:
         """
         url: str: RSS FEED url
         """
         # Parse the Finextra RSS feed
-        feed = feedparser.parse(url)
+        with self.metrics.time('feed.fetch'):
+            response = self._transport.get(url, headers=self._validators.headers(url), kind='feed')
+        if response.status_code == 304:
+            self.logger.info(f'RSS feed {url} is not modified')
+            self.metrics.count('feed.not_modified')
+            return
+        if response.status_code != 200:
+            raise ConnectionError(f"Failed to access {url} feed. Status code: {response.status_code}")
+        self._validators.stage(url, response)
+        import feedparser
+
+        with self.metrics.time('feed.parse'):
+            feed = feedparser.parse(response.content, response_headers=self._transport.headers(response))
 
         if len(feed.entries) <= 0:
             raise ValueError(f'RSS feed {url} is empty')
 
         # Iterate through feed entries
         for entry in feed.entries:
-            parsed_date = dateutil.parser.parse(entry.published)
-
             yield S3PDocument(
                 None,
                 entry.title,
@@ -85,29 +496,1075 @@ class Finextra(S3PParserBase):
                 {
                     'summary': entry.summary if 'summary' in entry else None,
                 },
-                parsed_date.replace(tzinfo=None),
+                self.published(entry),
                 None,
             )
 
+    @staticmethod
+    def published(entry) -> datetime:
+        """
+        Дата публикации записи фида в UTC (без tzinfo). feedparser уже разобрал дату в published_parsed
+        (struct_time в UTC), строка разбирается повторно, только если feedparser не распознал её формат.
+        Дата без часового пояса считается датой в UTC.
+        """
+        if entry.get('published_parsed'):
+            return datetime(*entry.published_parsed[:6])
+        import dateutil.parser
+
+        published = dateutil.parser.parse(entry.published)
+        if published.tzinfo is not None:
+            published = published.astimezone(timezone.utc).replace(tzinfo=None)
+        return published
+
+    def _archive(self, feed: str) -> Iterator[S3PDocument]:
+        """
+        Историческая загрузка канала фида со страниц архива (ARCHIVE_PATH) от новых материалов к старым.
+        Документы отдаются постранично, пока следующие BACKFILL_READ_AHEAD страниц загружаются параллельно.
+        Загрузка останавливается на пустой или отсутствующей странице, на странице с материалами старше from_date,
+        после MAX_PAGES страниц или когда поток документов закрыт (ограничения запуска).
+        Первая страница без распознанных материалов - ValueError: разметка архива не совпадает с ListingPage.
+        """
+        url = urlparse(feed)
+        channel = self._channel(feed)
+        from_date = self._restriction.from_date
+
+        def listing(page: int) -> tuple[str, list[S3PDocument] | None]:
+            address = f'{url.scheme}://{url.netloc}' + Finextra.ARCHIVE_PATH.format(channel=channel, page=page)
+            with self.metrics.time('archive.fetch'):
+                response = self._transport.get(address, kind='archive')
+            if response.status_code == 404:
+                return address, None
+            if response.status_code != 200:
+                raise ConnectionError(f"Failed to access {address} archive. Status code: {response.status_code}")
+            return address, Finextra.ListingPage(self.soup(response.text), address).documents()
+
+        with ThreadPoolExecutor(max_workers=Finextra.BACKFILL_READ_AHEAD, thread_name_prefix='finextra-archive') as pages:
+            listings = self._ordered(pages, listing, range(1, Finextra.MAX_PAGES + 1), Finextra.BACKFILL_READ_AHEAD)
+            with closing(listings):
+                for page, (address, found) in enumerate(listings, start=1):
+                    if page == 1 and found == []:
+                        raise ValueError(f'{address} has no materials matching {Finextra.ListingPage.ITEM}')
+                    if not found:
+                        return
+                    yield from found
+                    if from_date is not None and found[-1].published < from_date:
+                        return
+
     def _parsed_webpage(self, document: S3PDocument) -> S3PDocument | None:
-        #Делаем запрос к странице
-        response = requests.get(document.link)
-        if response.status_code != 200:
-            raise ConnectionError(f"Failed to access {document.link} page. Status code: {response.status_code}")
+        html = self._webpage(document)
+        if html is None:
+            return None
+        with self.metrics.time('page.parse'):
+            return Finextra.extract(html, document, self.html_backend)
 
-        html = response.text
-        soup = BeautifulSoup(html, 'html.parser')
+    def _webpage(self, document: S3PDocument) -> str | None:
+        """
+        Загружает страницу потоком и прекращает чтение, как только закрыты все блоки, которые читает
+        её профиль (см. Finextra.PageScanner): комментарии и виджеты в конце страницы не загружаются.
+        Страница для архива (archive_pages) читается целиком: повторный разбор может читать и другие блоки.
+        Возвращает None, если валидаторы ответа совпадают с отпечатком страницы (см. Finextra.Fingerprints).
+        """
+        #Делаем запрос к странице
+        with self.metrics.time('page.fetch'):
+            # Заново опубликованная страница могла измениться: кэш ответов не читается
+            refresh = self._fingerprints.republished(document)
+            response = self._transport.get(document.link, kind='page', stream=True, refresh=refresh)
+            if not refresh and self._pages.enabled and response.headers.get(Finextra.Transport.PARTIAL):
+                # В кэше часть страницы, прочитанная без архива
+                response = self._transport.get(document.link, kind='page', stream=True, refresh=True)
+            if response.status_code != 200:
+                response.close()
+                raise ConnectionError(f"Failed to access {document.link} page. Status code: {response.status_code}")
+            if self._fingerprints.unchanged(document, response.headers):
+                response.close()
+                self.logger.info(f'Document {document.link} is republished, page is not modified')
+                self.metrics.count('page.unchanged')
+                return None
+            scanner = Finextra.PageScanner(Finextra.PROFILES)
+            html = self._transport.read(document.link, response, kind='page', limit=self.max_body_size,
+                                        until=None if self._pages.enabled else scanner.scan)
+        if scanner.complete:
+            self.metrics.count('page.truncated')
+        self._pages.append(document, html, self._links.channels(document.link))
+        return html
 
+    @staticmethod
+    def extract(html: str, document: S3PDocument, backend: str = 'html.parser') -> S3PDocument:
+        """
+        Разбирает страницу документа профилем из Finextra.PROFILES. Дерево страницы разрушается сразу после
+        разбора: документ хранит только строки, а дерево из взаимных ссылок иначе освобождается лишь сборщиком мусора.
+        """
+        soup = Finextra.soup(html, backend)
         try:
-            return Finextra.ArticlePage(soup, document).document()
-        except Finextra.PageException:
-            ...
+            profile, container = Finextra.profile(soup)
+            if profile is None:
+                raise ValueError(f'{document.link} not parsed. Profile is not exist')
+            return profile(soup, container, document).document()
+        finally:
+            # У корня BeautifulSoup нет next_element, поэтому soup.decompose() не доходит до дерева
+            for element in list(soup.contents):
+                element.decompose()
+            soup.decompose()
+
+    @staticmethod
+    def _registered() -> bool:
+        """
+        Процессы разбора получают функцию разбора по имени модуля (pickle). Платформа загружает модуль из файла,
+        не регистрируя его в sys.modules, поэтому здесь регистрируется модуль с Finextra, а процессы загружают файл
+        модуля под тем же именем (EXTRACTOR_INIT). False, если имя занято другим модулем.
+        Платформа загружает файл заново для каждой задачи: модуль, зарегистрированный здесь при предыдущей загрузке
+        того же файла (без __spec__), заменяется.
+        """
+        module = sys.modules.get(Finextra.__module__)
+        if module is None or (module.__spec__ is None and getattr(module, '__file__', None) == __file__):
+            module = types.ModuleType(Finextra.__module__)
+            module.__file__ = __file__
+            module.Finextra = Finextra
+            sys.modules[Finextra.__module__] = module
+        return getattr(module, 'Finextra', None) is Finextra
+
+    @staticmethod
+    def _extracted(page: tuple[S3PDocument, str, str]) -> tuple[S3PDocument, S3PDocument | Exception, float]:
+        """
+        Разбор страницы в пуле процессов. Любая ошибка разбора возвращается, чтобы документ попал в очередь повторов.
+        Возвращает также время разбора в процессе (для Finextra.Metrics).
+        """
+        document, html, backend = page
+        started = time.perf_counter()
         try:
-            return Finextra.WebinarPage(soup, document).document()
-        except Finextra.PageException:
-            ...
+            return document, Finextra.extract(html, document, backend), time.perf_counter() - started
+        except Exception as e:
+            return document, e, time.perf_counter() - started
+
+    @staticmethod
+    def soup(html: str | bytes, backend: str = 'html.parser') -> 'BeautifulSoup':
+        """Разбирает страницу выбранным способом (см. Finextra.BACKENDS)"""
+        from bs4 import BeautifulSoup
+
+        builder, strained = Finextra.BACKENDS[backend]
+        return BeautifulSoup(html, builder, parse_only=Finextra.Strainer.of(Finextra.PROFILES) if strained else None)
+
+    @staticmethod
+    def profile(soup) -> tuple[type | None, object | None]:
+        """
+        Выбирает профиль страницы за один поиск: находит первый контейнер основного текста
+        и сравнивает его классы с профилями из Finextra.PROFILES (в порядке регистрации).
+        """
+        containers = {profile.CONTAINER for profile in Finextra.PROFILES}
+        container = soup.find(lambda tag: tag.name == 'div' and not containers.isdisjoint(tag.get('class') or ()))
+        if container is not None:
+            classes = set(container.get('class'))
+            for profile in Finextra.PROFILES:
+                if profile.CONTAINER in classes and profile.MARKERS <= classes:
+                    return profile, container
+        return None, None
+
+    class Metrics:
+        """
+        Счётчики и таймеры стадий запуска. Потокобезопасны: стадии выполняются в пулах потоков.
+        Таймер хранит количество замеров, сумму и максимум (сек.) и гистограмму по верхним границам BUCKETS.
+        """
+        BUCKETS: tuple[float, ...] = (0.001, 0.01, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+        class Timer:
+            def __init__(self):
+                self.count = 0
+                self.total = 0.0
+                self.max = 0.0
+                self.buckets = [0] * len(Finextra.Metrics.BUCKETS)
+
+        def __init__(self):
+            self._counters: dict[str, int] = {}
+            self._timers: dict[str, Finextra.Metrics.Timer] = {}
+            self._lock = threading.Lock()
+
+        def count(self, name: str, value: int = 1):
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + value
+
+        def observe(self, name: str, seconds: float):
+            with self._lock:
+                timer = self._timers.setdefault(name, Finextra.Metrics.Timer())
+                timer.count += 1
+                timer.total += seconds
+                timer.max = max(timer.max, seconds)
+                timer.buckets[next(i for i, bound in enumerate(self.BUCKETS) if seconds <= bound)] += 1
+
+        @contextmanager
+        def time(self, name: str):
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.observe(name, time.perf_counter() - started)
+
+        def summary(self) -> dict:
+            with self._lock:
+                return {
+                    'counters': dict(sorted(self._counters.items())),
+                    'timers': {
+                        name: {'count': timer.count, 'total': round(timer.total, 4), 'max': round(timer.max, 4),
+                               'histogram': {str(bound): n for bound, n in zip(self.BUCKETS, timer.buckets) if n}}
+                        for name, timer in sorted(self._timers.items())
+                    },
+                }
+
+    class Transport:
+        """
+        Общая HTTP сессия для фидов и страниц: пул keep-alive соединений, сжатие (gzip/brotli),
+        таймауты и повторы с экспоненциальной задержкой, учитывающие заголовок Retry-After.
+        """
+        RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
+        CHUNK_SIZE: int = 8 * 1024
+        # Заголовок ответа, тело которого прочитано не полностью (Transport.read с until). Сохраняется в кэше
+        PARTIAL: str = 'X-S3P-Partial'
+
+        def __init__(self, timeout: float, retries: int, pool_size: int = 1, limiter: 'Finextra.RateLimiter' = None,
+                     metrics: 'Finextra.Metrics' = None, cache: 'Finextra.ResponseCache' = None):
+            self.timeout = timeout
+            self.limiter = limiter or Finextra.RateLimiter(0)
+            self.metrics = metrics or Finextra.Metrics()
+            self.cache = cache or Finextra.ResponseCache('', 0)
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util import Retry, make_headers
+
+            self.session = requests.Session()
+            # make_headers добавляет br, только если установлен brotli
+            self.session.headers.update(make_headers(accept_encoding=True))
+            retry = Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=self.RETRY_STATUSES,
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1), max_retries=retry)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+
+        def get(self, url: str, headers: dict | None = None, kind: str | None = None,
+                stream: bool = False, refresh: bool = False) -> 'requests.Response':
+            """
+            :param kind: тип ресурса для кэша ответов (см. ResponseCache.TTL). None - ответ не кэшируется.
+            :param stream: не читать тело ответа. Тело читается Transport.read, который и сохраняет его в кэш.
+            :param refresh: запросить ресурс, не читая кэш. Ответ сохраняется в кэш.
+            """
+            if not refresh and (cached := self.cache.get(url, kind)) is not None:
+                return cached
+            with self.metrics.time('http.wait'):
+                self.limiter.wait(url)
+            started = time.monotonic()
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            latency = time.monotonic() - started
+            self.limiter.observe(url, response, latency)
+            self.metrics.observe('http.request', latency)
+            self.metrics.count(f'http.status.{response.status_code}')
+            if not stream:
+                self.metrics.count('http.bytes', len(response.content))
+                self.cache.put(url, kind, response)
+            return response
+
+        def read(self, url: str, response: 'requests.Response', kind: str | None = None, limit: int = 0,
+                 until: Callable[[str], bool] | None = None) -> str:
+            """
+            Читает тело ответа частями по CHUNK_SIZE байт, декодируя каждую часть сразу после получения.
+            :param limit: наибольший размер тела в байтах (0 - без ограничения). Больший ответ - BodyTooLarge.
+            :param until: получает очередной декодированный фрагмент. Если возвращает True, чтение прекращается,
+                а в кэш попадает уже прочитанная часть тела с заголовком PARTIAL.
+            """
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            chunks, parts, size = [], [], 0
+            try:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    size += len(chunk)
+                    if limit and size > limit:
+                        raise Finextra.BodyTooLarge(f'{url} is larger than {limit} bytes')
+                    chunks.append(chunk)
+                    parts.append(decoder.decode(chunk))
+                    if until is not None and until(parts[-1]):
+                        response.headers[self.PARTIAL] = '1'
+                        break
+                else:
+                    parts.append(decoder.decode(b'', final=True))
+            finally:
+                response.close()
+            if not getattr(response, 'from_cache', False):
+                self.metrics.count('http.bytes', size)
+                response._content = b''.join(chunks)
+                self.cache.put(url, kind, response)
+            return ''.join(parts)
+
+        @staticmethod
+        def headers(response: 'requests.Response') -> dict:
+            """Заголовки ответа в виде, который ожидает feedparser"""
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            headers['content-location'] = response.url
+            return headers
+
+    class ResponseCache:
+        """
+        Дисковый кэш успешных ответов в state_dir/responses.sqlite. Ключ - sha1 URL, тело хранится сжатым zlib.
+        Срок жизни записи зависит от типа ресурса (TTL). Когда суммарный размер тел превышает size байт,
+        удаляются записи, которые дольше всего не читались (LRU). Пустой state_dir или size <= 0 отключают кэш.
+        """
+        FILENAME: str = 'responses.sqlite'
+        TTL: dict[str, float] = {
+            'feed': 15 * 60,
+            'archive': 60 * 60,
+            'page': 30 * 24 * 60 * 60,
+        }
+        # Заголовки, которые описывают тело в том виде, в каком оно пришло по сети
+        TRANSPORT_HEADERS: frozenset[str] = frozenset({'content-encoding', 'content-length', 'transfer-encoding'})
+
+        def __init__(self, state_dir: str, size: int):
+            self.size = size
+            self.hits = 0
+            self.misses = 0
+            self._lock = threading.Lock()
+            self._db = None
+            if state_dir and size > 0:
+                os.makedirs(state_dir, exist_ok=True)
+                self._db = sqlite3.connect(os.path.join(state_dir, self.FILENAME), check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS responses (key BLOB PRIMARY KEY, url TEXT NOT NULL, '
+                                 'stored REAL NOT NULL, used REAL NOT NULL, size INTEGER NOT NULL, '
+                                 'headers TEXT NOT NULL, body BLOB NOT NULL)')
+                self._db.execute('CREATE INDEX IF NOT EXISTS responses_by_use ON responses (used)')
+                self._db.commit()
+
+        @staticmethod
+        def key(url: str) -> bytes:
+            return hashlib.sha1(url.encode('utf-8')).digest()
+
+        def get(self, url: str, kind: str | None) -> 'requests.Response | None':
+            if self._db is None or kind not in self.TTL:
+                return None
+            now = time.time()
+            with self._lock:
+                row = self._db.execute('SELECT headers, body FROM responses WHERE key = ? AND stored >= ?',
+                                       (self.key(url), now - self.TTL[kind])).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                self._db.execute('UPDATE responses SET used = ? WHERE key = ?', (now, self.key(url)))
+                self._db.commit()
+            import requests
+            from requests.utils import get_encoding_from_headers
+
+            response = requests.Response()
+            response.url = url
+            response.status_code = 200
+            response.headers.update(json.loads(row[0]))
+            response.encoding = get_encoding_from_headers(response.headers)
+            response._content = zlib.decompress(row[1])
+            response._content_consumed = True
+            response.from_cache = True
+            return response
+
+        def put(self, url: str, kind: str | None, response: 'requests.Response'):
+            if self._db is None or kind not in self.TTL or response.status_code != 200:
+                return
+            headers = {key: value for key, value in response.headers.items()
+                       if key.lower() not in self.TRANSPORT_HEADERS}
+            body = zlib.compress(response.content)
+            now = time.time()
+            with self._lock:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses (key, url, stored, used, size, headers, body) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (self.key(url), url, now, now, len(body), json.dumps(headers), body),
+                )
+                self.evict()
+
+        def evict(self):
+            """Удаляет давно не читавшиеся записи, пока суммарный размер тел больше size"""
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM '
+                '(SELECT key, SUM(size) OVER (ORDER BY used DESC, key) AS total FROM responses) WHERE total > ?)',
+                (self.size,),
+            )
+            self._db.commit()
+
+        def stats(self) -> dict:
+            if self._db is None:
+                return {}
+            with self._lock:
+                entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'size': size}
+
+    class PageArchive:
+        """
+        Архив загруженных страниц для mode="reextract". state_dir/pages.archive - сжатые zlib страницы, файл только
+        дописывается; state_dir/pages.sqlite - индекс: ссылка -> смещение и размер записи, документ фида.
+        Изменившаяся страница дописывается заново, индекс указывает на последнюю запись. Размер архива
+        не ограничивается, поэтому архив по умолчанию отключён (archive_pages).
+        """
+        FILENAME: str = 'pages.archive'
+        INDEX: str = 'pages.sqlite'
+
+        def __init__(self, state_dir: str, enabled: bool):
+            self.enabled = bool(state_dir and enabled)
+            self.path = os.path.join(state_dir, self.FILENAME) if self.enabled else None
+            self._lock = threading.Lock()
+            self._db = None
+            if self.enabled:
+                os.makedirs(state_dir, exist_ok=True)
+                self._db = sqlite3.connect(os.path.join(state_dir, self.INDEX), check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS pages (link TEXT PRIMARY KEY, published TEXT NOT NULL, '
+                                 'offset INTEGER NOT NULL, size INTEGER NOT NULL, crc INTEGER NOT NULL, '
+                                 'document TEXT NOT NULL)')
+                self._db.commit()
 
-        raise ValueError(f'{document.link} not parsed. Profile is not exist')
+        def append(self, document: S3PDocument, html: str, channels: list[str]):
+            if not self.enabled:
+                return
+            data = html.encode('utf-8')
+            crc = zlib.crc32(data)
+            with self._lock:
+                row = self._db.execute('SELECT crc FROM pages WHERE link = ?', (document.link,)).fetchone()
+                if row is not None and row[0] == crc:
+                    return
+                body = zlib.compress(data)
+                with open(self.path, 'ab') as file:
+                    offset = file.seek(0, os.SEEK_END)
+                    file.write(body)
+                archived = dataclasses.replace(document, other={**(document.other or {}), 'channels': list(channels)})
+                self._db.execute(
+                    'INSERT OR REPLACE INTO pages (link, published, offset, size, crc, document) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (document.link, document.published.isoformat(), offset, len(body), crc,
+                     json.dumps(Finextra.Checkpoint.dumps(archived))),
+                )
+                self._db.commit()
+
+        def documents(self) -> Iterator[S3PDocument]:
+            """Документы фидов из архива от новых к старым"""
+            with self._lock:
+                rows = self._db.execute('SELECT document FROM pages ORDER BY published DESC').fetchall()
+            for (data,) in rows:
+                yield Finextra.Checkpoint.loads(json.loads(data))
+
+        def page(self, link: str) -> str:
+            with self._lock:
+                offset, size = self._db.execute('SELECT offset, size FROM pages WHERE link = ?', (link,)).fetchone()
+            with open(self.path, 'rb') as file:
+                file.seek(offset)
+                return zlib.decompress(file.read(size)).decode('utf-8')
+
+    class ValidatorStore:
+        """
+        Валидаторы фидов (ETag, Last-Modified) для условного GET. Хранятся в state_dir/feeds.json.
+        Валидаторы полученного ответа применяются только после того, как фид обработан (commit).
+        """
+        FILENAME: str = 'feeds.json'
+
+        def __init__(self, state_dir: str):
+            self.path = os.path.join(state_dir, self.FILENAME) if state_dir else None
+            self._validators: dict[str, dict] = {}
+            self._staged: dict[str, dict] = {}
+            if self.path and os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self._validators = json.load(file)
+
+        def headers(self, url: str) -> dict:
+            validator = self._validators.get(url, {})
+            headers = {}
+            if validator.get('etag'):
+                headers['If-None-Match'] = validator['etag']
+            if validator.get('modified'):
+                headers['If-Modified-Since'] = validator['modified']
+            return headers
+
+        def stage(self, url: str, response: 'requests.Response'):
+            validator = {'etag': response.headers.get('ETag'), 'modified': response.headers.get('Last-Modified')}
+            if any(validator.values()):
+                self._staged[url] = validator
+
+        def staged(self, url: str) -> dict | None:
+            return self._staged.get(url)
+
+        def restore(self, url: str, validator: dict):
+            """Восстанавливает валидаторы, полученные прерванным запуском (см. Checkpoint)"""
+            self._staged[url] = validator
+
+        def commit(self, url: str):
+            if url not in self._staged:
+                return
+            self._validators[url] = self._staged.pop(url)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+                    json.dump(self._validators, file)
+                os.replace(self.path + '.tmp', self.path)
+
+    class LinkIndex:
+        """
+        Ссылки, встреченные за запуск, а также каналы и фиды, в которых они появились.
+        Список каналов общий для индекса и документа, поэтому каналы, найденные позже, попадают в уже найденный документ.
+        """
+
+        def __init__(self):
+            self._channels: dict[str, list[str]] = {}
+            self._feeds: dict[str, set[str]] = {}
+
+        def claim(self, link: str, channel: str, feed: str | None = None) -> bool:
+            """Возвращает True, если ссылка встречена впервые"""
+            if feed is not None:
+                self._feeds.setdefault(link, set()).add(feed)
+            channels = self._channels.get(link)
+            if channels is None:
+                self._channels[link] = [channel]
+                return True
+            if channel not in channels:
+                channels.append(channel)
+            return False
+
+        def channels(self, link: str) -> list[str]:
+            return self._channels.setdefault(link, [])
+
+        def feeds(self, links: Iterable[str]) -> set[str]:
+            """Фиды, в которых появились ссылки"""
+            return set().union(*(self._feeds.get(link, ()) for link in links))
+
+        def adopt(self, link: str, channels: list[str]):
+            """Регистрирует ссылку уже найденного документа вместе с его списком каналов"""
+            self._channels[link] = channels
+
+    class SeenIndex:
+        """
+        Ссылки документов, найденных в предыдущих запусках. Хранятся в state_dir/seen.sqlite
+        в виде sha1 ссылки; записи старше MAX_AGE и сверх MAX_ENTRIES (самые старые) удаляются.
+        """
+        FILENAME: str = 'seen.sqlite'
+        MAX_ENTRIES: int = 100_000
+        MAX_AGE: float = 180 * 24 * 60 * 60
+
+        def __init__(self, state_dir: str):
+            self._db = None
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+                self._db = sqlite3.connect(os.path.join(state_dir, self.FILENAME), check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, seen REAL NOT NULL)')
+                self._db.execute('CREATE INDEX IF NOT EXISTS seen_by_time ON seen (seen)')
+                self.evict()
+
+        @staticmethod
+        def key(link: str) -> bytes:
+            return hashlib.sha1(link.encode('utf-8')).digest()
+
+        def __contains__(self, link: str) -> bool:
+            if self._db is None:
+                return False
+            return self._db.execute('SELECT 1 FROM seen WHERE key = ?', (self.key(link),)).fetchone() is not None
+
+        def commit(self, links: Iterable[str]):
+            if self._db is not None:
+                now = time.time()
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO seen (key, seen) VALUES (?, ?)',
+                    ((self.key(link), now) for link in links),
+                )
+                self.evict()
+
+        def evict(self):
+            self._db.execute('DELETE FROM seen WHERE seen < ?', (time.time() - self.MAX_AGE,))
+            self._db.execute(
+                'DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY seen DESC LIMIT -1 OFFSET ?)',
+                (self.MAX_ENTRIES,),
+            )
+            self._db.commit()
+
+    class ShardRing:
+        """
+        Кольцо согласованного хэширования: распределяет фиды между экземплярами плагина. Каждый экземпляр
+        представлен на кольце REPLICAS точками, фид принадлежит экземпляру ближайшей точки по часовой стрелке.
+        При изменении shard_count переходит к другому экземпляру только часть фидов.
+        """
+        REPLICAS: int = 64
+
+        def __init__(self, shard_count: int):
+            self._points = sorted(
+                (self.hash(f'{shard}#{replica}'), shard) for shard in range(shard_count) for replica in range(self.REPLICAS)
+            )
+            self._hashes = [point for point, _ in self._points]
+
+        @staticmethod
+        def hash(key: str) -> int:
+            return int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'big')
+
+        def shard(self, key: str) -> int:
+            return self._points[bisect.bisect(self._hashes, self.hash(key)) % len(self._points)][1]
+
+    class LinkClaims:
+        """
+        Ссылки, закреплённые за экземплярами плагина, в shared_dir/claims.sqlite. Одна статья публикуется
+        в нескольких каналах, а каналы разных экземпляров не пересекаются: страницу загружает экземпляр,
+        первым закрепивший ссылку (INSERT OR IGNORE). Записи старше MAX_AGE удаляются.
+        """
+        FILENAME: str = 'claims.sqlite'
+        MAX_AGE: float = 180 * 24 * 60 * 60
+
+        def __init__(self, shared_dir: str):
+            self._db = None
+            if shared_dir:
+                os.makedirs(shared_dir, exist_ok=True)
+                # Файл открыт несколькими процессами: каждая запись фиксируется сразу, WAL не блокирует чтение
+                self._db = sqlite3.connect(os.path.join(shared_dir, self.FILENAME), timeout=30,
+                                           isolation_level=None, check_same_thread=False)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('CREATE TABLE IF NOT EXISTS claims '
+                                 '(key BLOB PRIMARY KEY, shard INTEGER NOT NULL, claimed REAL NOT NULL)')
+                self._db.execute('DELETE FROM claims WHERE claimed < ?', (time.time() - self.MAX_AGE,))
+
+        def claim(self, link: str, shard: int) -> bool:
+            """Закрепляет ссылку за экземпляром. False, если её уже закрепил другой экземпляр"""
+            if self._db is None:
+                return True
+            key = Finextra.SeenIndex.key(link)
+            self._db.execute('INSERT OR IGNORE INTO claims (key, shard, claimed) VALUES (?, ?, ?)',
+                             (key, shard, time.time()))
+            return self._db.execute('SELECT shard FROM claims WHERE key = ?', (key,)).fetchone()[0] == shard
+
+    class Fingerprints:
+        """
+        Отпечатки страниц в state_dir/fingerprints.sqlite: дата публикации из фида, валидаторы ответа
+        (ETag, Content-Length) и sha1 содержимого, извлечённого профилем. Ссылка, которую фид опубликовал заново
+        с более поздней датой, загружается повторно: при совпадении валидаторов тело страницы не читается,
+        при совпадении содержимого документ не передаётся в _find, иначе документ помечается как новая редакция
+        (other['revision']). Отпечатки сохраняются после успешного завершения запуска (commit).
+        """
+        FILENAME: str = 'fingerprints.sqlite'
+
+        def __init__(self, state_dir: str):
+            self._db = None
+            self._staged: dict[str, tuple] = {}
+            self._validators: dict[str, tuple[str | None, str | None]] = {}
+            self._lock = threading.Lock()
+            if state_dir:
+                os.makedirs(state_dir, exist_ok=True)
+                self._db = sqlite3.connect(os.path.join(state_dir, self.FILENAME), check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS fingerprints (link TEXT PRIMARY KEY, '
+                                 'published TEXT NOT NULL, etag TEXT, length TEXT, digest BLOB NOT NULL, '
+                                 'revision INTEGER NOT NULL)')
+                self._db.commit()
+
+        def _row(self, link: str) -> tuple | None:
+            if self._db is None:
+                return None
+            with self._lock:
+                return self._db.execute('SELECT published, etag, length, digest, revision FROM fingerprints '
+                                        'WHERE link = ?', (link,)).fetchone()
+
+        def _stage(self, document: S3PDocument, etag: str | None, length: str | None, digest: bytes, revision: int):
+            with self._lock:
+                self._staged[document.link] = (document.link, document.published.isoformat(), etag, length,
+                                               digest, revision)
+
+        @staticmethod
+        def digest(document: S3PDocument) -> bytes:
+            """sha1 полей, которые заполняют профили страниц"""
+            content = {'text': document.text, **{key: document.other.get(key) for key in ('type', 'general', 'other')}}
+            return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).digest()
+
+        def republished(self, document: S3PDocument) -> bool:
+            row = self._row(document.link)
+            return row is not None and datetime.fromisoformat(row[0]) < document.published
+
+        def unchanged(self, document: S3PDocument, headers) -> bool:
+            """Сравнивает валидаторы ответа с отпечатком до чтения тела страницы"""
+            etag, length = headers.get('ETag'), headers.get('Content-Length')
+            with self._lock:
+                self._validators[document.link] = (etag, length)
+            row = self._row(document.link)
+            if row is None:
+                return False
+            same = etag == row[1] if etag and row[1] else length is not None and length == row[2]
+            if same:
+                self._stage(document, row[1], row[2], row[3], row[4])
+            return same
+
+        def changed(self, document: S3PDocument) -> bool:
+            """Сравнивает извлечённое содержимое с отпечатком. Новая редакция получает other['revision']"""
+            digest = self.digest(document)
+            with self._lock:
+                etag, length = self._validators.pop(document.link, (None, None))
+            row = self._row(document.link)
+            revision = 1 if row is None else row[4]
+            if row is not None and row[3] == digest:
+                self._stage(document, etag, length, digest, revision)
+                return False
+            if row is not None:
+                revision += 1
+                document.other['revision'] = revision
+            self._stage(document, etag, length, digest, revision)
+            return True
+
+        def commit(self):
+            if self._db is None:
+                return
+            with self._lock:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO fingerprints (link, published, etag, length, digest, revision) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    self._staged.values(),
+                )
+                self._db.commit()
+                self._staged.clear()
+
+    class Checkpoint:
+        """
+        Состояние незавершённого запуска в state_dir: записи фидов вместе с их валидаторами (checkpoint.json),
+        документы, найденные до прерывания, и ссылки, уже переданные в _find (журнал checkpoint.jsonl).
+        Сохраняется каждые EVERY обработанных документов и при ошибке, удаляется после успешного завершения запуска.
+        checkpoint.json переписывается, только когда меняются записи фидов; в журнал дописываются документы и ссылки,
+        появившиеся после предыдущего сохранения, поэтому сохранение не зависит от числа уже найденных документов.
+
+        Checkpoint продолжает только запуск с теми же параметрами (scope: фиды, mode, ограничения), не старше MAX_AGE
+        и продолжавшийся меньше MAX_RESUMES раз; иначе он удаляется (discarded - причина), и запуск начинается заново.
+        Так повторяющаяся ошибка не возвращает каждый следующий запуск к тем же устаревшим записям фидов.
+        """
+        FILENAME: str = 'checkpoint.json'
+        JOURNAL: str = 'checkpoint.jsonl'
+        EVERY: int = 10
+        # Интервал перезапуска плагина (config.py): позже фиды уже содержат новые материалы
+        MAX_AGE: float = 24 * 60 * 60
+        MAX_RESUMES: int = 2
+
+        def __init__(self, state_dir: str, scope: dict | None = None):
+            self.path = os.path.join(state_dir, self.FILENAME) if state_dir else None
+            self.journal = os.path.join(state_dir, self.JOURNAL) if state_dir else None
+            self.scope = scope or {}
+            self.processed: set[str] = set()
+            self.documents: list[S3PDocument] = []
+            self.resumes = 0
+            self.discarded: str | None = None
+            self._feeds: dict[str, dict] = {}
+            self._resumed_feeds: dict[str, dict] = {}
+            # Изменения после предыдущего сохранения: записи фидов, обработанные ссылки и позиция в списке документов
+            self._changed = True
+            self._unsaved: list[str] = []
+            self._saved = 0
+            self._journaled: set[str] = set()
+            self._ticks = 0
+            self._lock = threading.Lock()
+            self.resumed = bool(self.path and os.path.exists(self.path))
+            if self.resumed:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    state = json.load(file)
+                records = self._records()
+                saved = max([state.get('saved', 0)] + [record['saved'] for record in records])
+                if state.get('scope') != self.scope:
+                    self.discarded = 'run parameters changed'
+                elif time.time() - saved > self.MAX_AGE:
+                    self.discarded = 'checkpoint is expired'
+                elif state.get('resumes', 0) >= self.MAX_RESUMES:
+                    self.discarded = f'run is already resumed {state["resumes"]} times'
+                if self.discarded is not None:
+                    self.resumed = False
+                    self.clear()
+                    return
+                self.resumes = state['resumes'] + 1
+                self._resumed_feeds = state['feeds']
+                for record in records:
+                    self.processed.update(record['processed'])
+                    self.documents.extend(self.loads(document) for document in record['documents'])
+                self._journaled = {document.link for document in self.documents}
+
+        def _records(self) -> list[dict]:
+            """Записи журнала. Последняя запись, дописанная не до конца (запуск прерван во время сохранения), пропускается"""
+            records = []
+            if not os.path.exists(self.journal):
+                return records
+            with open(self.journal, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+            return records
+
+        @staticmethod
+        def dumps(document: S3PDocument) -> dict:
+            data = dataclasses.asdict(document)
+            for key in ('published', 'loaded'):
+                data[key] = data[key].isoformat() if data[key] is not None else None
+            return data
+
+        @staticmethod
+        def loads(data: dict) -> S3PDocument:
+            for key in ('published', 'loaded'):
+                data[key] = datetime.fromisoformat(data[key]) if data[key] is not None else None
+            return S3PDocument(**data)
+
+        def entries(self, url: str) -> list[S3PDocument] | None:
+            """Записи фида из прерванного запуска"""
+            with self._lock:
+                if url not in self._resumed_feeds:
+                    return None
+                self._feeds[url] = self._resumed_feeds[url]
+                self._changed = True
+                return [self.loads(dict(entry)) for entry in self._feeds[url]['entries']]
+
+        def feed(self, url: str, documents: list[S3PDocument], validator: dict | None):
+            with self._lock:
+                self._feeds[url] = {'validator': validator, 'entries': [self.dumps(doc) for doc in documents]}
+                self._changed = True
+
+        def validators(self) -> dict[str, dict]:
+            return {url: feed['validator'] for url, feed in self._resumed_feeds.items() if feed['validator']}
+
+        def done(self, link: str):
+            """Ссылка передана в _find"""
+            with self._lock:
+                self.processed.add(link)
+                self._unsaved.append(link)
+
+        def tick(self, documents: list[S3PDocument]):
+            self._ticks += 1
+            if self._ticks % self.EVERY == 0:
+                self.save(documents)
+
+        def save(self, documents: list[S3PDocument]):
+            """:param documents: все документы запуска; в журнал попадают добавленные после предыдущего сохранения"""
+            if not self.path:
+                return
+            with self._lock:
+                saved = time.time()
+                if self._changed:
+                    state = {'scope': self.scope, 'saved': saved, 'resumes': self.resumes, 'feeds': self._feeds}
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    if not self.resumed and not os.path.exists(self.path):
+                        # Журнал прежнего checkpoint, удалённого не до конца, не относится к этому запуску
+                        with open(self.journal, 'w', encoding='utf-8'):
+                            pass
+                    with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+                        json.dump(state, file)
+                    os.replace(self.path + '.tmp', self.path)
+                    self._changed = False
+                added = [document for document in documents[self._saved:] if document.link not in self._journaled]
+                record = {'saved': saved, 'processed': self._unsaved,
+                          'documents': [self.dumps(document) for document in added]}
+                with open(self.journal, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps(record) + '\n')
+                self._journaled.update(document.link for document in added)
+                self._saved = len(documents)
+                self._unsaved = []
+
+        def clear(self):
+            for path in (self.path, self.journal):
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    class RetryQueue:
+        """
+        Материалы, которые не удалось обработать за запуск: документы с ошибкой загрузки или разбора страницы
+        (повторяются, пока у них меньше ATTEMPTS попыток) и недоступные фиды (не повторяются).
+        """
+        ATTEMPTS: int = 3
+
+        def __init__(self):
+            self._deferred: dict[str, list] = {}
+            self._failed: dict[str, Exception] = {}
+            self._lock = threading.Lock()
+
+        def defer(self, document: S3PDocument, error: Exception):
+            with self._lock:
+                item = self._deferred.setdefault(document.link, [document, 0])
+                item[1] += 1
+                self._failed[document.link] = error
+
+        def fail(self, url: str, error: Exception):
+            with self._lock:
+                self._failed[url] = error
+
+        def drop(self, link: str, error: Exception):
+            """Документ не будет повторён: он снимается с повторов, если был отложен ранее, и попадает в итог запуска"""
+            with self._lock:
+                self._deferred.pop(link, None)
+                self._failed[link] = error
+
+        def resolve(self, link: str):
+            with self._lock:
+                self._deferred.pop(link, None)
+                self._failed.pop(link, None)
+
+        def pending(self) -> list[S3PDocument]:
+            """Документы для следующей попытки"""
+            with self._lock:
+                return [document for document, attempts in self._deferred.values() if attempts < self.ATTEMPTS]
+
+        def failures(self) -> dict[str, str]:
+            """Итог запуска: материалы, которые так и не удалось обработать, и последняя ошибка"""
+            with self._lock:
+                return {link: repr(error) for link, error in self._failed.items()}
+
+    class RateLimiter:
+        """
+        Адаптивное ограничение частоты запросов, отдельное для каждого хоста (AIMD).
+        Начальная частота - rate запросов в секунду. Пока ответы успешные и быстрые (быстрее SLOW секунд),
+        частота растёт на INCREASE * rate, но не выше MAX_FACTOR * rate. На 429/503 (в том числе повторённые
+        urllib3) или медленный ответ частота уменьшается в DECREASE раз, но не ниже MIN_RATE,
+        а Retry-After приостанавливает запросы к хосту. rate <= 0 отключает ограничение.
+        """
+        INCREASE: float = 0.1
+        DECREASE: float = 0.5
+        MAX_FACTOR: float = 4.0
+        MIN_RATE: float = 0.1
+        SLOW: float = 5.0
+        THROTTLE_STATUSES: frozenset[int] = frozenset({429, 503})
+
+        class Host:
+            def __init__(self, rate: float):
+                self.rate = rate
+                self.next = 0.0
+                self.waited = 0.0
+                self.requests = 0
+                self.throttled = 0
+
+        def __init__(self, rate: float):
+            self.initial = rate
+            self._hosts: dict[str, Finextra.RateLimiter.Host] = {}
+            self._lock = threading.Lock()
+
+        def _host(self, url: str) -> 'Finextra.RateLimiter.Host':
+            host = urlparse(url).netloc
+            if host not in self._hosts:
+                self._hosts[host] = Finextra.RateLimiter.Host(self.initial)
+            return self._hosts[host]
+
+        def wait(self, url: str):
+            if self.initial <= 0:
+                return
+            with self._lock:
+                host = self._host(url)
+                now = time.monotonic()
+                delay = host.next - now
+                host.next = max(now, host.next) + 1.0 / host.rate
+                host.requests += 1
+                host.waited += max(delay, 0.0)
+            if delay > 0:
+                time.sleep(delay)
+
+        def observe(self, url: str, response: 'requests.Response', latency: float):
+            if self.initial <= 0:
+                return
+            retries = getattr(response.raw, 'retries', None)
+            statuses = [h.status for h in retries.history] if retries is not None else []
+            throttled = any(status in self.THROTTLE_STATUSES for status in statuses + [response.status_code])
+            with self._lock:
+                host = self._host(url)
+                if throttled or latency > self.SLOW:
+                    host.rate = max(self.MIN_RATE, host.rate * self.DECREASE)
+                    host.throttled += int(throttled)
+                    retry_after = response.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        host.next = max(host.next, time.monotonic() + int(retry_after))
+                elif response.status_code < 400:
+                    host.rate = min(self.initial * self.MAX_FACTOR, host.rate + self.INCREASE * self.initial)
+
+        def stats(self) -> dict[str, dict]:
+            """Текущая частота и суммарное ожидание по хостам"""
+            with self._lock:
+                return {
+                    name: {'rate': round(host.rate, 3), 'waited': round(host.waited, 3),
+                           'requests': host.requests, 'throttled': host.throttled}
+                    for name, host in self._hosts.items()
+                }
+
+    class Strainer:
+        """
+        Ограничивает разбор страницы блоками div, которые читают профили: контейнерами основного текста
+        и дополнительными разделами (SECTION_CLASSES, SECTION_IDS). Вложенные элементы этих блоков строятся полностью,
+        поэтому результат профилей совпадает с разбором всей страницы.
+
+        Реализует часть интерфейса bs4.filter.ElementFilter, которую BeautifulSoup использует для parse_only,
+        не наследуя его: иначе bs4 импортировался бы при загрузке модуля.
+        """
+
+        def __init__(self, classes: frozenset[str], ids: frozenset[str]):
+            self.classes = classes
+            self.ids = ids
+
+        @staticmethod
+        @functools.cache
+        def of(profiles: tuple[type, ...]) -> 'Finextra.Strainer':
+            classes = frozenset().union(*({p.CONTAINER} | p.SECTION_CLASSES for p in profiles))
+            ids = frozenset().union(*(p.SECTION_IDS for p in profiles))
+            return Finextra.Strainer(classes, ids)
+
+        @property
+        def includes_everything(self) -> bool:
+            return False
+
+        @property
+        def excludes_everything(self) -> bool:
+            return False
+
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            if name != 'div' or not attrs:
+                return False
+            if attrs.get('id') in self.ids:
+                return True
+            classes = attrs.get('class') or ()
+            if isinstance(classes, str):
+                classes = classes.split()
+            return not self.classes.isdisjoint(classes)
+
+        def allow_string_creation(self, string) -> bool:
+            return False
+
+    class PageScanner(HTMLParser):
+        """
+        Следит за блоками div, которые читают профили, в странице, загружаемой по частям (см. Transport.read).
+        Профили читают первый контейнер основного текста и первые разделы SECTION_CLASSES/SECTION_IDS,
+        поэтому, когда они закрыты, остаток страницы не меняет результат разбора. Блоки div сопоставляются так же,
+        как в BeautifulSoup: закрывающий тег закрывает последний открытый div, лишние закрывающие теги пропускаются.
+        """
+
+        def __init__(self, profiles: tuple[type, ...]):
+            super().__init__(convert_charrefs=False)
+            self.profiles = profiles
+            self.containers = {profile.CONTAINER for profile in profiles}
+            self.profile: type | None = None
+            self.complete = False
+            self._divs: list[set] = []
+            self._opened: set = set()
+            self._closed: set = set()
+
+        def scan(self, text: str) -> bool:
+            self.feed(text)
+            return self.complete
+
+        def handle_starttag(self, tag, attrs):
+            if tag != 'div' or self.complete:
+                return
+            attrs = dict(attrs)
+            classes = set((attrs.get('class') or '').split())
+            keys = {('class', name) for name in classes}
+            if attrs.get('id'):
+                keys.add(('id', attrs['id']))
+            if 'container' not in self._opened and not self.containers.isdisjoint(classes):
+                keys.add('container')
+                self.profile = next((profile for profile in self.profiles
+                                     if profile.CONTAINER in classes and profile.MARKERS <= classes), None)
+            # Профили читают только первый блок с каждым классом и id
+            keys -= self._opened
+            self._opened |= keys
+            self._divs.append(keys)
+
+        def handle_endtag(self, tag):
+            if tag != 'div' or not self._divs or self.complete:
+                return
+            self._closed |= self._divs.pop()
+            if self.profile is not None and 'container' in self._closed:
+                sections = ({('class', name) for name in self.profile.SECTION_CLASSES}
+                            | {('id', name) for name in self.profile.SECTION_IDS})
+                self.complete = sections <= self._closed
+
+    class BodyTooLarge(ValueError):
+        """Тело ответа больше max_body_size. Документ с такой страницей не повторяется (см. RetryQueue)"""
 
     class PageException(Exception):
 
@@ -120,17 +1577,28 @@ class Finextra(S3PParserBase):
         def __repr__(self):
             return f"Profile {type(self.profile)} Not found"
 
+        def __reduce__(self):
+            # Ошибка передаётся из процесса разбора (см. Finextra._extracted), профиль - только по типу
+            return Finextra.PageException, (type(self.profile), self.message, self.errors)
+
     class ArticlePage:
         META: str = 'Article'
+        # Класс контейнера основного текста и дополнительные классы, отличающие профиль
+        CONTAINER: str = 'alt-body-copy'
+        MARKERS: frozenset[str] = frozenset()
+        # Дополнительные разделы страницы (div), которые читает профиль
+        SECTION_CLASSES: frozenset[str] = frozenset({'additional-info'})
+        SECTION_IDS: frozenset[str] = frozenset()
 
-        def __init__(self, soup, document: S3PDocument):
+        def __init__(self, soup, container, document: S3PDocument):
             self.soup = soup
-            self.doc = copy.deepcopy(document)
-            self.doc.other['type'] = self.META
+            self.container = container
+            # Новый документ с собственным other: документ фида не изменяется
+            self.doc = dataclasses.replace(document, other={**(document.other or {}), 'type': self.META})
 
         def document(self) -> S3PDocument:
             # Main article text
-            article_body = self.soup.find('div', class_='alt-body-copy')
+            article_body = self.container
             if article_body is None:
                 raise Finextra.PageException(self, f'', None)
             else:
@@ -154,15 +1622,19 @@ class Finextra(S3PParserBase):
 
     class WebinarPage:
         META: str = 'Webinar'
+        CONTAINER: str = 'alt-body-copy'
+        MARKERS: frozenset[str] = frozenset({'event-summary'})
+        SECTION_CLASSES: frozenset[str] = frozenset()
+        SECTION_IDS: frozenset[str] = frozenset({'ctl00_ctl00_body_main_SummaryForm_hSpeakers'})
 
-        def __init__(self, soup, document: S3PDocument):
+        def __init__(self, soup, container, document: S3PDocument):
             self.soup = soup
-            self.doc = copy.deepcopy(document)
-            self.doc.other['type'] = self.META
+            self.container = container
+            self.doc = dataclasses.replace(document, other={**(document.other or {}), 'type': self.META})
 
         def document(self) -> S3PDocument:
             # Main Webinar Text
-            event_summary_article_body = self.soup.find('div', class_='event-summary alt-body-copy')
+            event_summary_article_body = self.container
             if event_summary_article_body is None:
                 raise Finextra.PageException(self, f'', None)
             else:
@@ -194,4 +1666,73 @@ class Finextra(S3PParserBase):
                     speakers.append([name, activity])
                 additional_dict['speakers'] = speakers
                 return additional_dict
-            return None
\ No newline at end of file
+            return None
+
+    class ListingPage:
+        """
+        Страница архива канала: список материалов с заголовком, ссылкой и датой публикации (с точностью до дня).
+        Селекторы не проверены на сохранённой странице сайта (см. Finextra.EXPERIMENTAL_MODES).
+        """
+        ITEM: str = 'div.module--story'
+        LINK: str = 'h4 a'
+        DATE: str = '.news-date'
+        DATE_FORMAT: str = '%d %B %Y'
+
+        def __init__(self, soup, url: str):
+            self.soup = soup
+            self.url = url
+
+        def documents(self) -> list[S3PDocument]:
+            documents = []
+            for item in self.soup.select(self.ITEM):
+                link, date = item.select_one(self.LINK), item.select_one(self.DATE)
+                if link is None or date is None or not link.get('href'):
+                    continue
+                documents.append(S3PDocument(
+                    None,
+                    link.get_text(strip=True),
+                    None,
+                    None,
+                    urljoin(self.url, link['href']),
+                    None,
+                    {
+                        'summary': None,
+                    },
+                    datetime.strptime(date.get_text(strip=True), self.DATE_FORMAT),
+                    None,
+                ))
+            return documents
+
+    # Профили страниц. Более специфичные профили (с MARKERS) регистрируются раньше общих
+    PROFILES: tuple[type, ...] = (WebinarPage, ArticlePage)
+
+    # html_backend: (builder BeautifulSoup, разбор только нужных разделов)
+    BACKENDS: dict[str, tuple[str, bool]] = {
+        'html.parser': ('html.parser', False),
+        'html.parser-strained': ('html.parser', True),
+        'lxml': ('lxml', False),
+        'lxml-strained': ('lxml', True),
+    }
+
+    # Инициализация процесса разбора (exec с name и path): модуль плагина импортируется или загружается из файла.
+    # Функция инициализации сама передаётся по имени, поэтому используется встроенная exec
+    EXTRACTOR_INIT: str = '''
+import importlib, importlib.util, sys
+try:
+    importlib.import_module(name)
+except ImportError:
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+'''
+
+    MODES: tuple[str, ...] = ('rss', 'reextract')
+    # Режимы, разметка страниц которых проверена только на замене сайта (tests/fixtures/stand_in.py).
+    # Не указываются в config.py и документации, пока в корпусе нет сохранённой страницы сайта
+    EXPERIMENTAL_MODES: tuple[str, ...] = ('backfill',)
+    # Страницы архива канала для mode="backfill"
+    ARCHIVE_PATH: str = '/latest-news/{channel}?page={page}'
+    # Страницы архива канала, загружаемые заранее
+    BACKFILL_READ_AHEAD: int = 4
+    MAX_PAGES: int = 500
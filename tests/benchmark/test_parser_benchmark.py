@@ -0,0 +1,153 @@
+import datetime
+import gc
+import inspect
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+from s3p_sdk.plugin.types import SOURCE
+from s3p_sdk.types import S3PRefer, S3PDocument, S3PPlugin, S3PPluginRestrictions
+
+from tests.fixtures.benchmark import fix_benchmark
+from tests.fixtures.payload_class import fix_plugin_class
+from tests.fixtures.stand_in import StandIn, CORPUS
+
+BACKENDS: tuple[str, ...] = ('html.parser', 'html.parser-strained')
+# Загрузка модуля плагина так, как это делает платформа (см. tests/payload/test_plugin_run.py).
+# Печатает время exec_module (сек.) и пик памяти (байт, только при аргументе memory)
+STARTUP: str = '''
+import importlib.util, sys, time, tracemalloc
+spec = importlib.util.spec_from_file_location('finextra', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+if sys.argv[2] == 'memory':
+    tracemalloc.start()
+started = time.perf_counter()
+spec.loader.exec_module(module)
+print(time.perf_counter() - started, tracemalloc.get_traced_memory()[1])
+'''
+
+# Количество записей в большом фиде (test_rss_feed_large)
+LARGE_FEED: int = 3000
+
+
+def feed_document() -> S3PDocument:
+    return S3PDocument(None, 'title', None, None, 'https://www.finextra.com/newsarticle/1/page', None,
+                       {'summary': 'summary'}, datetime.datetime(2024, 9, 1, 10, 0), None)
+
+
+@pytest.mark.benchmark
+class TestParserBenchmark:
+    """
+    Производительность разбора фидов и страниц на сохранённом корпусе (tests/fixtures/corpus).
+    Результаты сравниваются с tests/benchmark/baseline.json (см. tests/fixtures/benchmark.py).
+    """
+
+    @pytest.fixture(scope="class")
+    def stand_in(self):
+        with StandIn() as stand_in:
+            yield stand_in
+
+    @pytest.fixture(scope="class")
+    def make_payload(self, fix_plugin_class, stand_in):
+        def factory(restrictions: S3PPluginRestrictions = S3PPluginRestrictions(None, None, None, None), **params):
+            return fix_plugin_class(refer=S3PRefer(1, 'test-refer', SOURCE, None),
+                                    plugin=S3PPlugin(1, 'unittests/repo/1', True, None, None, SOURCE, "3.0"),
+                                    restrictions=restrictions, feeds=stand_in.feeds(), **params)
+        return factory
+
+    def test_rss_feed(self, fix_benchmark, make_payload, stand_in):
+        payload = make_payload(rate=0)
+
+        def run() -> int:
+            return sum(len(list(payload._rss_feed(feed))) for feed in stand_in.feeds())
+
+        fix_benchmark.measure('rss_feed', run)
+        fix_benchmark.check('rss_feed')
+
+    def test_rss_feed_large(self, fix_benchmark, make_payload):
+        started = datetime.datetime(2024, 9, 2, 18, 0)
+        items = ''.join(
+            f'<item><title>Title {i}</title><link>https://www.finextra.com/newsarticle/{i}/title-{i}</link>'
+            f'<description>Summary {i}</description>'
+            f'<pubDate>{(started - datetime.timedelta(minutes=47 * i)).strftime("%a, %d %b %Y %H:%M:%S")} GMT</pubDate>'
+            f'</item>'
+            for i in range(LARGE_FEED)
+        )
+        rss = f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>'.encode()
+
+        def get(url, headers=None, kind=None):
+            response = requests.Response()
+            response.url = url
+            response.status_code = 200
+            response._content = rss
+            return response
+
+        payload = make_payload(rate=0)
+        payload._transport.get = get
+
+        def run() -> int:
+            return len(list(payload._rss_feed('https://www.finextra.com/rss/channel.aspx?channel=large/feed')))
+
+        fix_benchmark.measure('rss_feed[large]', run, rounds=5)
+        fix_benchmark.check('rss_feed[large]')
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    @pytest.mark.parametrize('page, profile', [('article.html', 'ArticlePage'), ('webinar.html', 'WebinarPage')])
+    def test_page_document(self, fix_benchmark, fix_plugin_class, page, profile, backend):
+        html = Path(CORPUS / 'pages' / page).read_text(encoding='utf-8')
+        name = f'{profile}.document[{backend}]'
+
+        def run() -> int:
+            for _ in range(20):
+                soup = fix_plugin_class.soup(html, backend)
+                found, container = fix_plugin_class.profile(soup)
+                assert found is getattr(fix_plugin_class, profile)
+                found(soup, container, feed_document()).document()
+            return 20
+
+        fix_benchmark.measure(name, run)
+        fix_benchmark.check(name)
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_extract(self, fix_benchmark, fix_plugin_class, backend):
+        # Пик памяти при разборе страниц подряд без сборщика циклов: растёт на память, которую удерживает
+        # каждая разобранная страница
+        pages = [Path(CORPUS / 'pages' / page).read_text(encoding='utf-8') for page in ('article.html', 'webinar.html')]
+        name = f'extract[{backend}]'
+
+        def run() -> int:
+            gc.disable()
+            try:
+                for _ in range(10):
+                    for html in pages:
+                        fix_plugin_class.extract(html, feed_document(), backend)
+            finally:
+                gc.enable()
+            return 10 * len(pages)
+
+        fix_benchmark.measure(name, run)
+        fix_benchmark.check(name)
+
+    def test_parse_pipeline(self, fix_benchmark, make_payload):
+        def run() -> int:
+            return len(make_payload(workers=8, rate=0).content())
+
+        fix_benchmark.measure('parse_pipeline', run, rounds=5)
+        fix_benchmark.check('parse_pipeline')
+
+    def test_module_startup(self, fix_benchmark, fix_plugin_class):
+        path = inspect.getfile(fix_plugin_class)
+
+        def load(mode: str) -> tuple[float, int]:
+            output = subprocess.run([sys.executable, '-c', STARTUP, path, mode],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            return float(output[0]), int(output[1])
+
+        rounds = 5
+        elapsed = sum(load('time')[0] for _ in range(rounds))
+        _, peak = load('memory')
+
+        fix_benchmark.record('module_startup', rounds / elapsed, peak)
+        fix_benchmark.check('module_startup')
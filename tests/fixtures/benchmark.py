@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+BASELINE: Path = Path(__file__).parent.parent / 'benchmark' / 'baseline.json'
+# Страница эталонной нагрузки (см. Benchmark.reference)
+REFERENCE_PAGE: str = (Path(__file__).parent / 'corpus' / 'pages' / 'article.html').read_text(encoding='utf-8')
+# Допустимое ухудшение относительно baseline (0.5 = на 50%)
+THRESHOLD: float = float(os.environ.get('S3P_BENCH_THRESHOLD', '0.5'))
+# S3P_BENCH_UPDATE=1 перезаписывает baseline измеренными значениями
+UPDATE: bool = os.environ.get('S3P_BENCH_UPDATE') == '1'
+# Минимальная длительность раунда (сек.): короткие раунды сильнее зависят от случайных задержек машины
+MIN_ROUND: float = 0.25
+
+
+class Benchmark:
+    """
+    Измеряет производительность (единиц в секунду) и пиковую память (КиБ, tracemalloc) и сравнивает их с baseline.
+
+    Время и память измеряются раздельно: tracemalloc замедляет выполнение. Раунды измеряемой и эталонной нагрузки
+    чередуются, relative - медиана их отношений по раундам: так результат не зависит от скорости машины
+    и от отдельных медленных раундов.
+    """
+
+    def __init__(self, path: Path = BASELINE, threshold: float = THRESHOLD, update: bool = UPDATE):
+        self.path = path
+        self.threshold = threshold
+        self.update = update
+        self.baseline: dict[str, dict] = json.loads(path.read_text()) if path.exists() else {}
+        self.results: dict[str, dict] = {}
+
+    @staticmethod
+    def rate(fn: Callable[[], int]) -> float:
+        """Единиц в секунду за раунд: fn повторяется, пока раунд не продлится MIN_ROUND секунд"""
+        units, started = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - started) < MIN_ROUND or not units:
+            units += fn()
+        return units / elapsed
+
+    @staticmethod
+    def reference() -> int:
+        """Эталонная нагрузка: разбор страницы корпуса стандартным HTMLParser"""
+        for _ in range(20):
+            parser = HTMLParser()
+            parser.feed(REFERENCE_PAGE)
+            parser.close()
+        return 20
+
+    def measure(self, name: str, fn: Callable[[], int], rounds: int = 11) -> dict:
+        """
+        :param fn: выполняет одну итерацию и возвращает количество обработанных единиц (страниц, записей фида).
+        Раунды fn чередуются с раундами эталонной нагрузки, чтобы обе измерялись при одной загрузке машины.
+        """
+        fn()  # прогрев
+        rates, references = [], []
+        for _ in range(rounds):
+            rates.append(self.rate(fn))
+            references.append(self.rate(self.reference))
+
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        relative = statistics.median(rate / reference for rate, reference in zip(rates, references))
+        return self.record(name, statistics.median(rates), peak, relative=relative)
+
+    def record(self, name: str, rate: float, peak: int, relative: float | None = None) -> dict:
+        """
+        Сохраняет результат, измеренный вне measure (например, в отдельном процессе). peak - в байтах.
+        Без relative эталонная нагрузка (медиана 5 раундов) измеряется сразу после результата.
+        """
+        if relative is None:
+            relative = rate / statistics.median(self.rate(self.reference) for _ in range(5))
+        result = {'rate': round(rate, 2), 'relative': round(relative, 4), 'peak_kib': round(peak / 1024, 1)}
+        self.results[name] = result
+        print(f'\n{name}: {result["rate"]} units/s ({result["relative"]} of reference), peak {result["peak_kib"]} KiB')
+        return result
+
+    def check(self, name: str):
+        """Сравнивает результат с baseline. При S3P_BENCH_UPDATE=1 результат сохраняется в baseline"""
+        result = self.results[name]
+        if self.update:
+            self.baseline[name] = result
+            self.path.write_text(json.dumps(self.baseline, indent=2, sort_keys=True) + '\n')
+            return
+        reference = self.baseline.get(name)
+        if reference is None:
+            pytest.skip(f'{name}: no baseline. Run with S3P_BENCH_UPDATE=1 to record it')
+        assert result['relative'] >= reference['relative'] / (1 + self.threshold), \
+            f"{name}: {result['relative']} of reference is slower than baseline {reference['relative']}"
+        assert result['peak_kib'] <= reference['peak_kib'] * (1 + self.threshold), \
+            f"{name}: peak {result['peak_kib']} KiB is above baseline {reference['peak_kib']} KiB"
+
+
+@pytest.fixture(scope="session")
+def fix_benchmark() -> Benchmark:
+    return Benchmark()
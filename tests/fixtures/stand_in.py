@@ -0,0 +1,186 @@
+import hashlib
+import html
+import random
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from email.utils import parsedate_to_datetime, format_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+CORPUS: Path = Path(__file__).parent / 'corpus'
+CHANNELS: tuple[str, ...] = tuple(sorted(path.stem for path in (CORPUS / 'feeds').glob('*.xml')))
+# Путь страницы -> файл корпуса
+PAGES: dict[str, str] = {
+    'newsarticle': 'article.html',
+    'event-info': 'webinar.html',
+}
+# Количество материалов на странице архива канала (/latest-news/{channel}?page=N)
+LISTING_PAGE_SIZE: int = 5
+
+
+class StandIn:
+    """
+    Локальная замена finextra.com, отдающая сохранённый корпус (tests/fixtures/corpus).
+
+    Фиды доступны по тем же путям, что и на сайте (/rss/channel.aspx?channel=ai/feed), ссылки в них указывают
+    на этот сервер. Страницы архива каналов (/latest-news/ai?page=1) строятся из записей фида канала.
+    Поддерживает ETag/304 для фидов, задержку ответа и внедрение ошибок. peak - наибольшее число запросов,
+    которые сервер обрабатывал одновременно:
+    - latency: задержка каждого ответа в секундах;
+    - errors: {префикс пути: статус}, например {'/newsarticle/44003': 503};
+    - error_rate: доля запросов страниц, на которые отвечает 503 с Retry-After: 0;
+    - tail: размер блока комментариев (байт), добавляемого в конец страниц;
+    - shift: сдвиг дат публикации в фидах (часы), как при повторной публикации материалов;
+    - replace: {фрагмент: замена} в теле страниц, например, чтобы убрать блок, который ожидает профиль.
+    """
+
+    def __init__(self, latency: float = 0.0, errors: dict[str, int] | None = None, error_rate: float = 0.0,
+                 seed: int = 0, tail: int = 0, shift: float = 0.0, replace: dict[bytes, bytes] | None = None):
+        self.latency = latency
+        self.tail = tail
+        self.shift = shift
+        self.replace = replace or {}
+        self.errors = errors or {}
+        self.error_rate = error_rate
+        self.requests: list[tuple[str, int]] = []
+        self.active = 0
+        self.peak = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def feeds(self, channels: tuple[str, ...] = CHANNELS) -> list[str]:
+        return [f'{self.base}/rss/channel.aspx?channel={channel}/feed' for channel in channels]
+
+    def hits(self, prefix: str = '/') -> int:
+        return len([path for path, _ in self.requests if path.startswith(prefix)])
+
+    def start(self) -> 'StandIn':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StandIn':
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def respond(self, path: str, query: str, headers) -> tuple[int, dict, bytes]:
+        for prefix, status in self.errors.items():
+            if path.startswith(prefix):
+                return status, {'Retry-After': '0'}, b''
+
+        if path == '/rss/channel.aspx':
+            channel = parse_qs(query).get('channel', [''])[0].split('/')[0]
+            if channel not in CHANNELS:
+                return 404, {}, b''
+            body = (CORPUS / 'feeds' / f'{channel}.xml').read_text(encoding='utf-8').replace('{base}', self.base)
+            if self.shift:
+                body = re.sub(r'<pubDate>(.*?)</pubDate>', lambda date: '<pubDate>' + format_datetime(
+                    parsedate_to_datetime(date.group(1)) + timedelta(hours=self.shift), usegmt=True) + '</pubDate>', body)
+            body = body.encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if headers.get('If-None-Match') == etag:
+                return 304, {'ETag': etag}, b''
+            return 200, {'Content-Type': 'application/rss+xml; charset=utf-8', 'ETag': etag}, body
+
+        match = re.match(r'^/latest-news/([\w-]+)$', path)
+        if match:
+            if match.group(1) not in CHANNELS:
+                return 404, {}, b''
+            page = int(parse_qs(query).get('page', ['1'])[0])
+            return 200, {'Content-Type': 'text/html; charset=utf-8'}, self.listing(match.group(1), page)
+
+        match = re.match(r'^/([\w-]+)/\d+/', path)
+        if match and match.group(1) in PAGES:
+            with self._lock:
+                failed = self.error_rate and self._random.random() < self.error_rate
+            if failed:
+                return 503, {'Retry-After': '0'}, b''
+            body = (CORPUS / 'pages' / PAGES[match.group(1)]).read_bytes()
+            for fragment, replacement in self.replace.items():
+                body = body.replace(fragment, replacement)
+            if self.tail:
+                comments = b'<div class="comment"><p>' + b'x' * self.tail + b'</p></div>'
+                body = body.replace(b'</body>', comments + b'</body>')
+            return 200, {'Content-Type': 'text/html; charset=utf-8'}, body
+
+        return 404, {}, b''
+
+    @staticmethod
+    def listing(channel: str, page: int) -> bytes:
+        """Страница архива канала: материалы фида от новых к старым по LISTING_PAGE_SIZE на странице"""
+        root = ET.parse(CORPUS / 'feeds' / f'{channel}.xml').getroot()
+        items = sorted(
+            ((item.findtext('title'), item.findtext('link').replace('{base}', ''),
+              parsedate_to_datetime(item.findtext('pubDate'))) for item in root.iter('item')),
+            key=lambda item: item[2], reverse=True,
+        )
+        stories = ''.join(
+            f'<div class="module--story"><h4><a href="{link}">{html.escape(title)}</a></h4>'
+            f'<span class="news-date">{published.strftime("%d %B %Y")}</span></div>'
+            for title, link, published in items[(page - 1) * LISTING_PAGE_SIZE:page * LISTING_PAGE_SIZE]
+        )
+        return (f'<html><body><div class="header"><ul class="nav"><li><a href="/">Home</a></li></ul></div>'
+                f'<div class="modulegroup--latest-storylisting">{stories}</div></body></html>').encode('utf-8')
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with stand_in._lock:
+                    stand_in.active += 1
+                    stand_in.peak = max(stand_in.peak, stand_in.active)
+                try:
+                    if stand_in.latency:
+                        time.sleep(stand_in.latency)
+                    status, headers, body = stand_in.respond(url.path, url.query, self.headers)
+                finally:
+                    with stand_in._lock:
+                        stand_in.active -= 1
+                with stand_in._lock:
+                    stand_in.requests.append((self.path, status))
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Клиент закрыл соединение, не дочитав страницу (см. Finextra.Transport.read)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def fix_stand_in():
+    with StandIn() as stand_in:
+        yield stand_in
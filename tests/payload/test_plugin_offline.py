@@ -0,0 +1,595 @@
+import datetime
+import importlib.util
+import inspect
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+import requests
+from s3p_sdk.exceptions.parser import S3PPluginPayloadError
+from s3p_sdk.plugin.types import SOURCE
+from s3p_sdk.types import S3PRefer, S3PDocument, S3PPlugin, S3PPluginRestrictions
+
+from tests.fixtures.payload_class import fix_plugin_class, imported_payload_class
+from tests.fixtures.stand_in import StandIn, fix_stand_in
+
+# Количество уникальных ссылок во всех фидах корпуса
+CORPUS_DOCUMENTS: int = 60
+
+
+def reset_state(state_dir: Path):
+    """Сброс состояния между запусками (как при разработке): остаются только кэш ответов и архив страниц"""
+    for name in (imported_payload_class.SeenIndex.FILENAME, imported_payload_class.ValidatorStore.FILENAME,
+                 imported_payload_class.Fingerprints.FILENAME):
+        (state_dir / name).unlink(missing_ok=True)
+
+
+@pytest.mark.payload_set
+class TestPayloadOffline:
+    """
+    Запуск парсера против локальной замены finextra.com (tests/fixtures/stand_in.py) без обращения к сети.
+    """
+
+    @pytest.fixture(scope="class")
+    def fix_s3pRefer(self) -> S3PRefer:
+        return S3PRefer(1, 'test-refer', SOURCE, None)
+
+    @pytest.fixture(scope="class")
+    def fix_s3pPlugin(self) -> S3PPlugin:
+        return S3PPlugin(1, 'unittests/repo/1', True, None, None, SOURCE, "3.0")
+
+    @pytest.fixture
+    def make_payload(self, fix_plugin_class, fix_s3pRefer, fix_s3pPlugin):
+        """Экземпляр плагина для stand_in: по умолчанию без ограничений, все фиды, 4 потока загрузки, без rate"""
+        def factory(stand_in: StandIn, **params):
+            params = {'restrictions': S3PPluginRestrictions(None, None, None, None), 'feeds': stand_in.feeds(),
+                      'workers': 4, 'rate': 0, **params}
+            return fix_plugin_class(refer=fix_s3pRefer, plugin=fix_s3pPlugin, **params)
+        return factory
+
+    @pytest.fixture
+    def run_payload(self, make_payload):
+        def run(stand_in: StandIn, restrictions: S3PPluginRestrictions, **params) -> tuple[S3PDocument, ...]:
+            return make_payload(stand_in, restrictions=restrictions, **params).content()
+        return run
+
+    @pytest.mark.timeout(30)
+    def test_all_documents(self, run_payload, fix_stand_in):
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None))
+
+        assert len(docs) == CORPUS_DOCUMENTS
+        assert len({doc.link for doc in docs}) == CORPUS_DOCUMENTS
+        assert fix_stand_in.hits('/rss/') == 9
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') == CORPUS_DOCUMENTS
+        assert [doc.published for doc in docs] == sorted((doc.published for doc in docs), reverse=True)
+        for doc in docs:
+            assert doc.title and doc.link.startswith(fix_stand_in.base) and doc.text
+            assert isinstance(doc.published, datetime.datetime)
+            assert doc.other['type'] == ('Webinar' if '/event-info/' in doc.link else 'Article')
+            assert doc.other['channels']
+            assert doc.loaded is not None
+
+    @pytest.mark.timeout(30)
+    def test_maximum_materials(self, run_payload, fix_stand_in):
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(20, None, None, None), workers=4)
+
+        assert len(docs) == 20
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') <= 20 + 4 * 2
+
+    @pytest.mark.timeout(30)
+    def test_date_restrictions(self, run_payload, fix_stand_in):
+        boundary = datetime.datetime(2024, 9, 2, 12, 0)
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, boundary, None))
+
+        assert docs and all(doc.published >= boundary for doc in docs)
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') == len(docs)
+
+    @pytest.mark.timeout(30)
+    def test_concurrent_fetch_with_latency(self, run_payload):
+        with StandIn(latency=0.05) as stand_in:
+            docs = run_payload(stand_in, S3PPluginRestrictions(None, None, None, None), workers=8)
+
+        assert len(docs) == CORPUS_DOCUMENTS
+        # Запросы перекрываются по времени, но их не больше, чем потоков загрузки
+        assert 2 <= stand_in.peak <= 8
+
+    @pytest.mark.timeout(30)
+    def test_repeated_run_with_state(self, run_payload, fix_stand_in, tmp_path):
+        first = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path))
+        fix_stand_in.requests.clear()
+
+        second = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path))
+
+        assert len(first) == CORPUS_DOCUMENTS
+        assert second == ()
+        assert [status for _, status in fix_stand_in.requests] == [304] * 9
+
+    @pytest.mark.timeout(30)
+    def test_republished_pages_not_read_when_validators_match(self, make_payload, fix_stand_in, tmp_path):
+        def run() -> tuple[tuple[S3PDocument, ...], dict]:
+            payload = make_payload(fix_stand_in, state_dir=str(tmp_path))
+            return payload.content(), payload.metrics.summary()
+
+        first, _ = run()
+        fix_stand_in.shift = 1
+        second, summary = run()
+
+        assert len(first) == CORPUS_DOCUMENTS
+        assert second == ()
+        # Страницы запрошены заново, но Content-Length совпал с отпечатком и тело не разбиралось
+        assert summary['counters']['page.unchanged'] == CORPUS_DOCUMENTS
+        assert 'page.parse' not in summary['timers'] and 'find' not in summary['timers']
+
+    @pytest.mark.timeout(60)
+    def test_republished_pages_bypass_response_cache(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path,
+                                                     monkeypatch):
+        def run() -> tuple[S3PDocument, ...]:
+            return make_payload(fix_stand_in, state_dir=str(tmp_path), cache_size=16).content()
+
+        first = run()
+        # Материалы опубликованы заново, текст статей изменён; страницы первого запуска остаются в кэше
+        monkeypatch.setitem(fix_plugin_class.ResponseCache.TTL, 'feed', 0)
+        fix_stand_in.shift = 1
+        fix_stand_in.replace = {b'rolled out': b'expanded'}
+        second = run()
+
+        articles = [doc for doc in first if doc.other['type'] == 'Article']
+        assert articles and len(second) == len(articles)
+        assert all(doc.other['revision'] == 2 and 'expanded' in doc.text for doc in second)
+
+    @pytest.mark.timeout(30)
+    def test_rate_limiter_adapts(self, make_payload, fix_plugin_class):
+        with StandIn(error_rate=0.2, seed=1) as stand_in:
+            payload = make_payload(stand_in, rate=50, retries=10)
+            docs = payload.content()
+
+        stats = payload.limiter.stats()[urlparse(stand_in.base).netloc]
+        assert len(docs) == CORPUS_DOCUMENTS
+        assert stats['requests'] == stand_in.hits('/') - len([s for _, s in stand_in.requests if s == 503])
+        assert stats['throttled'] > 0
+        assert stats['rate'] < 50 * fix_plugin_class.RateLimiter.MAX_FACTOR
+
+    def test_rate_limiter_speeds_up_when_healthy(self, fix_plugin_class):
+        limiter = fix_plugin_class.RateLimiter(2.0)
+        response = requests.Response()
+        response.status_code = 200
+
+        for _ in range(100):
+            limiter.wait('https://www.finextra.com/a')
+            limiter.observe('https://www.finextra.com/a', response, 0.01)
+            limiter._host('https://www.finextra.com/a').next = 0.0
+
+        assert limiter.stats()['www.finextra.com']['rate'] == 2.0 * limiter.MAX_FACTOR
+
+    @pytest.mark.timeout(30)
+    def test_bad_pages_do_not_abort_run(self, make_payload):
+        broken = '/newsarticle/44003/'
+        with StandIn(errors={broken: 404}) as stand_in:
+            missing_feed = stand_in.base + '/rss/channel.aspx?channel=jobs/feed'
+            payload = make_payload(stand_in, feeds=stand_in.feeds() + [missing_feed], retries=0)
+            docs = payload.content()
+
+        failures = payload.retries.failures()
+        assert len(docs) == CORPUS_DOCUMENTS - 1
+        assert stand_in.hits(broken) == payload.RetryQueue.ATTEMPTS
+        assert len(failures) == 2 and missing_feed in failures
+        assert any(link.startswith(stand_in.base + broken) for link in failures)
+
+    @pytest.mark.timeout(30)
+    def test_failed_pages_are_retried_in_next_run(self, run_payload, tmp_path):
+        broken = '/newsarticle/44003/'
+        with StandIn(errors={broken: 404}) as stand_in:
+            first = run_payload(stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path))
+            stand_in.errors.clear()
+            stand_in.requests.clear()
+            second = run_payload(stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path))
+
+        feeds = [(path, status) for path, status in stand_in.requests if path.startswith('/rss/')]
+        assert len(first) == CORPUS_DOCUMENTS - 1
+        # Валидаторы фида с неудавшейся страницей не сохранены: фид загружен целиком, страница повторена
+        assert len(second) == 1 and second[0].link.startswith(stand_in.base + broken)
+        assert [path for path, status in feeds if status != 304] == ['/rss/channel.aspx?channel=blockchain/feed']
+
+    @pytest.mark.timeout(60)
+    @pytest.mark.parametrize('parse_workers', [0, 2])
+    def test_profile_errors_do_not_abort_run(self, make_payload, parse_workers):
+        # Без заголовка докладчика WebinarPage.speakers получает AttributeError
+        title = b'<h4 class="event-speakers-people-text-title"> Jane Doe </h4>'
+        with StandIn(replace={title: b''}) as stand_in:
+            payload = make_payload(stand_in, parse_workers=parse_workers)
+            docs = payload.content()
+            webinars = stand_in.hits('/event-info/') // payload.RetryQueue.ATTEMPTS
+
+        failures = payload.retries.failures()
+        assert webinars > 0
+        assert len(docs) == CORPUS_DOCUMENTS - webinars
+        assert all(doc.other['type'] == 'Article' for doc in docs)
+        assert len(failures) == webinars
+        assert all('/event-info/' in link and 'AttributeError' in error for link, error in failures.items())
+
+    @pytest.mark.timeout(30)
+    def test_resume_from_checkpoint(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path):
+        interrupted = make_payload(fix_stand_in, state_dir=str(tmp_path))
+        find = interrupted._find
+
+        def crash(document):
+            if len(interrupted._parsed_document) == 25:
+                raise RuntimeError('worker is killed')
+            find(document)
+
+        interrupted._find = crash
+        with pytest.raises(S3PPluginPayloadError):
+            interrupted.content()
+        assert (tmp_path / fix_plugin_class.Checkpoint.FILENAME).exists()
+        fix_stand_in.requests.clear()
+
+        docs = make_payload(fix_stand_in, state_dir=str(tmp_path)).content()
+
+        assert len(docs) == CORPUS_DOCUMENTS
+        assert len({doc.link for doc in docs}) == CORPUS_DOCUMENTS
+        assert fix_stand_in.hits('/rss/') == 0
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') == CORPUS_DOCUMENTS - 25
+        assert not (tmp_path / fix_plugin_class.Checkpoint.FILENAME).exists()
+        assert all(doc.other['channels'] for doc in docs)
+
+    @pytest.mark.timeout(60)
+    def test_repeated_crash_does_not_lock_checkpoint(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path):
+        def run(crash: bool) -> tuple[S3PDocument, ...]:
+            fix_stand_in.requests.clear()
+            payload = make_payload(fix_stand_in, state_dir=str(tmp_path))
+            if crash:
+                find = payload._find
+
+                def crashing(document):
+                    if len(payload._parsed_document) == 25:
+                        raise RuntimeError('deterministic crash')
+                    find(document)
+
+                payload._find = crashing
+            return payload.content()
+
+        checkpoint = tmp_path / fix_plugin_class.Checkpoint.FILENAME
+        with pytest.raises(S3PPluginPayloadError):
+            run(crash=True)
+        assert checkpoint.exists()
+        # Продолженный запуск падает на том же месте: checkpoint удаляется
+        with pytest.raises(S3PPluginPayloadError):
+            run(crash=True)
+        assert fix_stand_in.hits('/rss/') == 0
+        assert not checkpoint.exists()
+
+        docs = run(crash=False)
+        assert fix_stand_in.hits('/rss/') == 9
+        assert len(docs) == CORPUS_DOCUMENTS
+
+    @pytest.mark.timeout(60)
+    @pytest.mark.parametrize('change', ['restrictions', 'feeds', 'age'])
+    def test_stale_checkpoint_is_discarded(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path, monkeypatch,
+                                           change):
+        restrictions, feeds = S3PPluginRestrictions(None, None, None, None), fix_stand_in.feeds()
+        interrupted = make_payload(fix_stand_in, restrictions=restrictions, feeds=feeds, state_dir=str(tmp_path))
+
+        def crash(document):
+            raise RuntimeError('worker is killed')
+
+        interrupted._find = crash
+        with pytest.raises(S3PPluginPayloadError):
+            interrupted.content()
+        assert (tmp_path / fix_plugin_class.Checkpoint.FILENAME).exists()
+        fix_stand_in.requests.clear()
+
+        if change == 'restrictions':
+            restrictions = S3PPluginRestrictions(None, None, datetime.datetime(2024, 9, 1), None)
+        elif change == 'feeds':
+            feeds = feeds[:-1]
+        else:
+            monkeypatch.setattr(fix_plugin_class.Checkpoint, 'MAX_AGE', 0)
+        payload = make_payload(fix_stand_in, restrictions=restrictions, feeds=feeds, state_dir=str(tmp_path))
+
+        assert payload._checkpoint.discarded is not None and not payload._checkpoint.resumed
+        payload.content()
+        assert fix_stand_in.hits('/rss/') == len(feeds)
+
+    def test_checkpoint_appends_new_documents(self, fix_plugin_class, tmp_path):
+        scope = {'feeds': ['https://www.finextra.com/rss/channel.aspx?channel=ai/feed']}
+        documents = [S3PDocument(None, f'Title {i}', None, 'text', f'https://www.finextra.com/newsarticle/{i}/', None,
+                                 {}, datetime.datetime(2024, 9, 1, 10, i), None) for i in range(30)]
+        checkpoint = fix_plugin_class.Checkpoint(str(tmp_path), scope)
+        checkpoint.feed(scope['feeds'][0], documents, None)
+        header = tmp_path / fix_plugin_class.Checkpoint.FILENAME
+        inodes = set()
+        for i, document in enumerate(documents):
+            checkpoint.done(document.link)
+            checkpoint.tick(documents[:i + 1])
+            if header.exists():
+                inodes.add(header.stat().st_ino)
+
+        # Каждое сохранение дописывает в журнал только новые документы, записи фидов не переписываются
+        journal = tmp_path / fix_plugin_class.Checkpoint.JOURNAL
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert [(len(record['documents']), len(record['processed'])) for record in records] == [(10, 10)] * 3
+        assert len(inodes) == 1
+        # Запись, дописанная не до конца, пропускается
+        with journal.open('a') as file:
+            file.write('{"saved": ')
+
+        resumed = fix_plugin_class.Checkpoint(str(tmp_path), scope)
+        assert resumed.resumed
+        assert [document.link for document in resumed.documents] == [document.link for document in documents]
+        assert resumed.processed == {document.link for document in documents}
+        resumed.clear()
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.timeout(60)
+    def test_parse_in_process_pool(self, run_payload, fix_stand_in):
+        inline = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None))
+        pooled = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), parse_workers=2)
+
+        assert [(doc.link, doc.text, doc.other) for doc in pooled] == [(doc.link, doc.text, doc.other) for doc in inline]
+
+    @pytest.mark.timeout(60)
+    def test_parse_in_process_pool_when_loaded_from_file(self, fix_plugin_class, fix_s3pRefer, fix_s3pPlugin,
+                                                         fix_stand_in):
+        # Модуль загружается так же, как его загружает платформа (см. test_plugin_run.fix_payload):
+        # заново для каждой задачи под тем же именем
+        name = 's3p_plugin_parser_finextra'
+        assert name not in sys.modules
+
+        def inline(document):
+            raise AssertionError('page is parsed in a thread')
+
+        try:
+            for _ in range(2):
+                spec = importlib.util.spec_from_file_location(name, inspect.getfile(fix_plugin_class))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                payload = module.Finextra(refer=fix_s3pRefer, plugin=fix_s3pPlugin,
+                                          restrictions=S3PPluginRestrictions(None, None, None, None),
+                                          feeds=fix_stand_in.feeds(), workers=4, rate=0, parse_workers=2)
+                payload._parsed_webpage = inline
+                docs = payload.content()
+
+                assert payload.parse_workers == 2
+                assert len(docs) == CORPUS_DOCUMENTS and not payload.retries.failures()
+        finally:
+            sys.modules.pop(name, None)
+
+    @pytest.mark.timeout(30)
+    def test_backfill_from_archive(self, run_payload, fix_plugin_class, fix_stand_in):
+        boundary = datetime.datetime(2024, 9, 1)
+        rss = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None))
+        fix_stand_in.requests.clear()
+
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, boundary, None), mode='backfill')
+
+        # Страницы архива содержат дату публикации без времени
+        expected = {doc.link for doc in rss if doc.published.date() >= boundary.date()}
+        assert {doc.link for doc in docs} == expected
+        assert [doc.published for doc in docs] == sorted((doc.published for doc in docs), reverse=True)
+        assert all(doc.text and doc.other['channels'] for doc in docs)
+        assert fix_stand_in.hits('/rss/') == 0
+        # Загрузка архива канала останавливается на первой пустой странице или странице старше from_date
+        assert fix_stand_in.hits('/latest-news/') <= len(fix_stand_in.feeds()) * fix_plugin_class.BACKFILL_READ_AHEAD * 2
+
+    @pytest.mark.timeout(30)
+    def test_backfill_stops_at_maximum_materials(self, run_payload, fix_plugin_class, fix_stand_in, monkeypatch):
+        monkeypatch.setattr(fix_plugin_class, 'BACKFILL_READ_AHEAD', 1)
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(5, None, None, None), mode='backfill', workers=1)
+
+        assert len(docs) == 5
+        # Архивы читаются по мере объединения: полностью прочитан был бы каждый канал
+        assert fix_stand_in.hits('/latest-news/') < 2 * len(fix_stand_in.feeds())
+
+    @pytest.mark.timeout(30)
+    def test_backfill_unrecognised_listing_fails_feeds(self, make_payload, fix_plugin_class, fix_stand_in,
+                                                       monkeypatch):
+        monkeypatch.setattr(fix_plugin_class.ListingPage, 'ITEM', 'div.unknown-story')
+        payload = make_payload(fix_stand_in, mode='backfill')
+
+        assert payload.content() == ()
+        assert set(payload.retries.failures()) == set(fix_stand_in.feeds())
+
+    @pytest.mark.timeout(30)
+    def test_metrics_summary(self, make_payload, fix_stand_in, tmp_path):
+        summaries = []
+
+        def run() -> tuple[S3PDocument, ...]:
+            payload = make_payload(fix_stand_in, state_dir=str(tmp_path))
+            payload.metrics_hook = summaries.append
+            return payload.content()
+
+        run()
+        run()
+
+        first, second = summaries
+        assert first['documents'] == CORPUS_DOCUMENTS and first['failures'] == 0
+        assert first['timers']['feed.parse']['count'] == 9
+        assert first['timers']['page.fetch']['count'] == first['timers']['page.parse']['count'] == CORPUS_DOCUMENTS
+        assert first['timers']['find']['count'] == CORPUS_DOCUMENTS
+        assert first['counters']['http.bytes'] > 0
+        # 98 записей в фидах корпуса, из них 38 повторяют ссылки других каналов
+        assert first['counters']['dedup.run'] == 98 - CORPUS_DOCUMENTS
+        assert sum(first['timers']['http.request']['histogram'].values()) == 9 + CORPUS_DOCUMENTS
+        assert first['counters']['http.status.200'] == 9 + CORPUS_DOCUMENTS
+        assert second['documents'] == 0
+        assert second['counters']['feed.not_modified'] == 9
+        assert 'page.fetch' not in second['timers']
+
+    @pytest.mark.timeout(60)
+    def test_response_cache(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path, monkeypatch):
+        def run() -> tuple[tuple[S3PDocument, ...], dict]:
+            reset_state(tmp_path)
+            fix_stand_in.requests.clear()
+            payload = make_payload(fix_stand_in, state_dir=str(tmp_path), cache_size=16)
+            return payload.content(), payload.cache.stats()
+
+        first, first_stats = run()
+        second, second_stats = run()
+        monkeypatch.setitem(fix_plugin_class.ResponseCache.TTL, 'feed', 0)
+        third, _ = run()
+
+        assert len(first) == len(second) == len(third) == CORPUS_DOCUMENTS
+        assert first_stats['misses'] == 9 + CORPUS_DOCUMENTS and first_stats['entries'] == 9 + CORPUS_DOCUMENTS
+        assert second_stats['hits'] == 9 + CORPUS_DOCUMENTS
+        # Фиды устарели по TTL, страницы взяты из кэша
+        assert fix_stand_in.hits('/rss/') == 9 and fix_stand_in.hits('/newsarticle/') == 0
+
+    def test_response_cache_evicts_least_recently_used(self, fix_plugin_class, tmp_path):
+        cache = fix_plugin_class.ResponseCache(str(tmp_path), 2500)
+
+        def response(body: bytes) -> requests.Response:
+            result = requests.Response()
+            result.status_code = 200
+            result._content = body
+            return result
+
+        pages = {f'https://www.finextra.com/newsarticle/{i}/': os.urandom(1000) for i in range(3)}
+        urls = list(pages)
+        cache.put(urls[0], 'page', response(pages[urls[0]]))
+        cache.put(urls[1], 'page', response(pages[urls[1]]))
+        assert cache.get(urls[0], 'page').content == pages[urls[0]]
+        cache.put(urls[2], 'page', response(pages[urls[2]]))
+
+        assert cache.get(urls[1], 'page') is None
+        assert cache.get(urls[0], 'page').content == pages[urls[0]]
+        assert cache.get(urls[2], 'page').content == pages[urls[2]]
+        assert cache.get(urls[2], None) is None
+        assert cache.stats()['entries'] == 2
+
+    @pytest.mark.timeout(60)
+    def test_reextract_from_page_archive(self, run_payload, fix_plugin_class, fix_stand_in, tmp_path):
+        fetched = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path),
+                              archive_pages=True)
+        fix_stand_in.requests.clear()
+
+        docs = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path),
+                           mode='reextract', parse_workers=2)
+
+        assert fix_stand_in.requests == []
+        assert [(doc.link, doc.published, doc.text, doc.other['type']) for doc in docs] == \
+               [(doc.link, doc.published, doc.text, doc.other['type']) for doc in fetched]
+        assert all(doc.other['channels'] for doc in docs)
+        # Повторная загрузка неизменных страниц не дописывает архив
+        archive = tmp_path / fix_plugin_class.PageArchive.FILENAME
+        size = archive.stat().st_size
+        reset_state(tmp_path)
+        fix_stand_in.requests.clear()
+        refetched = run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None), state_dir=str(tmp_path),
+                                archive_pages=True)
+        assert len(refetched) == CORPUS_DOCUMENTS and fix_stand_in.hits('/newsarticle/') > 0
+        assert archive.stat().st_size == size
+
+    @pytest.mark.timeout(60)
+    def test_shards_split_feeds_and_links(self, run_payload, fix_plugin_class, fix_stand_in, tmp_path):
+        shards = 3
+        with ThreadPoolExecutor(max_workers=shards) as pool:
+            results = list(pool.map(
+                lambda index: run_payload(fix_stand_in, S3PPluginRestrictions(None, None, None, None),
+                                          shard_index=index, shard_count=shards, shared_dir=str(tmp_path)),
+                range(shards),
+            ))
+
+        links = [doc.link for docs in results for doc in docs]
+        assert len(links) == len(set(links)) == CORPUS_DOCUMENTS
+        # Каждый фид и каждая страница запрошены одним экземпляром
+        assert fix_stand_in.hits('/rss/') == 9
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') == CORPUS_DOCUMENTS
+
+    @pytest.mark.timeout(60)
+    def test_shards_keep_separate_state(self, make_payload, fix_plugin_class, fix_stand_in, tmp_path):
+        def shard(index: int):
+            return make_payload(fix_stand_in, state_dir=str(tmp_path), shard_index=index, shard_count=2,
+                                shared_dir=str(tmp_path / 'shared'))
+
+        # Прерванный запуск экземпляра с фидами оставляет checkpoint в своём подкаталоге
+        crashed, other = sorted((shard(0), shard(1)), key=lambda payload: -len(payload.feeds))
+
+        def crash(document):
+            raise RuntimeError('worker is killed')
+
+        crashed._find = crash
+        with pytest.raises(S3PPluginPayloadError):
+            crashed.content()
+        checkpoint = tmp_path / f'shard-{crashed.shard_index}' / fix_plugin_class.Checkpoint.FILENAME
+        assert checkpoint.exists()
+
+        # Другой экземпляр не продолжает чужой checkpoint и не перезаписывает чужие валидаторы фидов
+        docs = other.content()
+        assert checkpoint.exists()
+        assert not other._checkpoint.resumed
+        assert all(set(doc.other['channels']) <= {other._channel(feed) for feed in other.feeds} for doc in docs)
+        resumed = shard(crashed.shard_index)
+        assert resumed._checkpoint.resumed
+        resumed.content()
+
+        for payload in (crashed, other):
+            validators = tmp_path / f'shard-{payload.shard_index}' / fix_plugin_class.ValidatorStore.FILENAME
+            stored = set(json.loads(validators.read_text())) if validators.exists() else set()
+            assert stored == set(payload.feeds)
+
+    def test_shard_ring_moves_few_feeds(self, fix_plugin_class):
+        feeds = [f'https://www.finextra.com/rss/channel.aspx?channel={i}/feed' for i in range(1000)]
+        three = fix_plugin_class.ShardRing(3)
+        four = fix_plugin_class.ShardRing(4)
+
+        counts = [[three.shard(feed) for feed in feeds].count(shard) for shard in range(3)]
+        assert min(counts) > 1000 / 3 * 0.7
+        # Новый экземпляр забирает около четверти фидов, остальные остаются на прежних экземплярах
+        moved = [feed for feed in feeds if three.shard(feed) != four.shard(feed)]
+        assert all(four.shard(feed) == 3 for feed in moved)
+        assert len(moved) < 1000 / 4 * 1.5
+
+    @pytest.mark.timeout(30)
+    def test_page_download_stops_after_profile_blocks(self, make_payload):
+        tail = 1024 * 1024
+
+        def run(stand_in: StandIn, **params):
+            payload = make_payload(stand_in, **params)
+            return payload.content(), payload.metrics.summary()['counters']
+
+        with StandIn() as stand_in:
+            reference, _ = run(stand_in)
+        with StandIn(tail=tail) as stand_in:
+            docs, counters = run(stand_in, max_body_size=tail // 2)
+
+        assert [(urlparse(doc.link).path, doc.text, doc.other) for doc in docs] == \
+               [(urlparse(doc.link).path, doc.text, doc.other) for doc in reference]
+        assert counters['page.truncated'] == CORPUS_DOCUMENTS
+        assert counters['http.bytes'] < CORPUS_DOCUMENTS * 64 * 1024
+
+    @pytest.mark.timeout(30)
+    def test_page_larger_than_max_body_size(self, make_payload, fix_stand_in):
+        payload = make_payload(fix_stand_in, max_body_size=1024)
+
+        docs = payload.content()
+
+        assert docs == ()
+        assert len(payload.retries.failures()) == CORPUS_DOCUMENTS
+        assert all('larger than 1024 bytes' in error for error in payload.retries.failures().values())
+        # Страница больше max_body_size не повторяется
+        assert fix_stand_in.hits('/newsarticle/') + fix_stand_in.hits('/event-info/') == CORPUS_DOCUMENTS
+
+    @pytest.mark.timeout(60)
+    def test_archived_pages_are_complete(self, make_payload, tmp_path):
+        def run(stand_in: StandIn, **params):
+            reset_state(tmp_path)
+            stand_in.requests.clear()
+            payload = make_payload(stand_in, state_dir=str(tmp_path), cache_size=16, **params)
+            payload.content()
+            return payload
+
+        with StandIn(tail=64 * 1024) as stand_in:
+            # Без архива страницы читаются до конца блоков профиля, в кэш попадает их начало
+            run(stand_in)
+            payload = run(stand_in, archive_pages=True)
+            pages = stand_in.hits('/newsarticle/') + stand_in.hits('/event-info/')
+
+        # Части страниц из кэша загружены заново целиком
+        assert pages == CORPUS_DOCUMENTS
+        documents = list(payload._pages.documents())
+        assert len(documents) == CORPUS_DOCUMENTS
+        assert all(payload._pages.page(document.link).rstrip().endswith('</html>') for document in documents)
@@ -0,0 +1,85 @@
+import datetime
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+from s3p_sdk.types import S3PDocument
+
+from tests.fixtures.payload_class import fix_plugin_class
+
+PAGES = Path(__file__).parent.parent / 'fixtures' / 'corpus' / 'pages'
+
+
+def feed_document(link: str = 'https://www.finextra.com/newsarticle/1/page') -> S3PDocument:
+    return S3PDocument(None, 'title', None, None, link, None, {'summary': 'summary'},
+                       datetime.datetime(2024, 9, 1, 10, 0), None)
+
+
+@pytest.mark.payload_set
+class TestPayloadPages:
+    """
+    Проверка профилей страниц на сохранённых страницах Finextra
+    """
+
+    @pytest.fixture
+    def page(self):
+        def load(name: str) -> str:
+            return (PAGES / name).read_text(encoding='utf-8')
+        return load
+
+    def test_article_profile(self, fix_plugin_class, page):
+        soup = BeautifulSoup(page('article.html'), 'html.parser')
+
+        profile, container = fix_plugin_class.profile(soup)
+        doc = profile(soup, container, feed_document()).document()
+
+        assert profile is fix_plugin_class.ArticlePage
+        assert doc.other['type'] == 'Article'
+        assert doc.text.startswith('A major European bank has rolled out')
+        assert doc.other['general'] == {
+            'company': ['Example Bank', 'EBA Clearing'],
+            'channel': ['Payments', 'Retail banking'],
+            'keyword': ['SEPA', 'Instant payments'],
+        }
+
+    def test_webinar_profile(self, fix_plugin_class, page):
+        soup = BeautifulSoup(page('webinar.html'), 'html.parser')
+
+        profile, container = fix_plugin_class.profile(soup)
+        doc = profile(soup, container, feed_document()).document()
+
+        assert profile is fix_plugin_class.WebinarPage
+        assert doc.other['type'] == 'Webinar'
+        assert doc.text.split('\n')[0] == 'How banks use machine learning to stop APP fraud'
+        assert doc.other['other'] == {'speakers': [['Jane Doe', 'Head of Fraud, Example Bank'],
+                                                   ['John Smith', 'CTO, Fintech Ltd']]}
+
+    def test_unknown_profile(self, fix_plugin_class, page):
+        soup = BeautifulSoup(page('unknown.html'), 'html.parser')
+
+        assert fix_plugin_class.profile(soup) == (None, None)
+
+    def test_feed_document_is_not_modified(self, fix_plugin_class, page):
+        soup = BeautifulSoup(page('article.html'), 'html.parser')
+        document = feed_document()
+
+        profile, container = fix_plugin_class.profile(soup)
+        profile(soup, container, document).document()
+
+        assert document.text is None
+        assert document.other == {'summary': 'summary'}
+
+    @pytest.mark.parametrize('name', ['article.html', 'webinar.html', 'unknown.html'])
+    def test_backends_give_identical_documents(self, fix_plugin_class, page, name):
+        html = page(name)
+        results = {}
+        for backend in fix_plugin_class.BACKENDS:
+            if backend.startswith('lxml'):
+                pytest.importorskip('lxml')
+            soup = fix_plugin_class.soup(html, backend)
+            profile, container = fix_plugin_class.profile(soup)
+            doc = profile(soup, container, feed_document()).document() if profile else None
+            results[backend] = (profile, doc.text if doc else None, doc.other if doc else None)
+
+        reference = results.pop('html.parser')
+        assert all(result == reference for result in results.values()), results